@@ -81,6 +81,60 @@ DATABASES = {
 }
 
 
+# Caches
+# "api" holds rendered /api/trends/* and /api/ft/* responses (see core/cache.py).
+# LocMemCache evicts least-recently-used entries past MAX_ENTRIES; swap in
+# django.core.cache.backends.filebased.FileBasedCache to share it across workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 2000, 'CULL_FREQUENCY': 10},
+    },
+}
+
+
+# Fitted forecast models (pickled statsmodels results), LRU-evicted past the cap.
+FORECAST_CACHE_DIR = BASE_DIR / "var" / "forecast_cache"
+FORECAST_CACHE_MAX_ENTRIES = 256
+# engine=auto with latency_budget_ms only picks ARIMA when the fit is cached or
+# its expected cost fits the budget. The cost is the last measured fit for the
+# resort and window length; this is the fallback before any fit was timed.
+ARIMA_COLD_FIT_MS = 3000
+
+# Generated year workbooks (/api/export/year_excel), keyed by resort, year and
+# that year's data versions; least recently downloaded files go past the cap.
+EXPORT_CACHE_DIR = BASE_DIR / "var" / "export_cache"
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Zips written by batch exports (manage.py batch_export, POST /api/export/batch).
+EXPORT_BATCH_DIR = BASE_DIR / "var" / "exports"
+
+# Analytic ft reads (revenue series, /api/ft/summary, /api/ft/timeseries/revenue):
+# "orm" reads ft_daily_rollup; "duckdb" scans a Parquet snapshot of the needed
+# financial_transaction columns, partitioned by business_date month and refreshed
+# by load_ft_csv (needs duckdb + pyarrow; falls back to "orm" while stale).
+FT_ANALYTICS_BACKEND = "orm"
+FT_SNAPSHOT_DIR = BASE_DIR / "var" / "ft_parquet"
+
+# Encoder for API JSON (core/serializers.py): "auto" uses orjson when installed,
+# else the stdlib; "orjson", "json" or a dotted path to a callable(obj) -> bytes.
+API_JSON_SERIALIZER = "auto"
+
+# Processes in the background job pool (core/jobs.py) used for model fits and exports.
+JOB_WORKERS = 2
+# Workers touch a running job's heartbeat this often; a PENDING/RUNNING job
+# silent for JOB_STALE_SECONDS (worker restart, pool crash) is marked FAILED
+# by the next identical submit instead of deduplicating it forever.
+JOB_HEARTBEAT_SECONDS = 15
+JOB_STALE_SECONDS = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
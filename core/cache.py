@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import threading
+from datetime import date
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.core.cache import caches
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import condition
+
+from .models import DataVersion
+
+CACHE_ALIAS = "api"
+LOWERCASE_PARAMS = ("grp", "basis")
+DATE_PARAMS = ("date_from", "date_to")
+
+_stats = {"hits": 0, "misses": 0, "bypass": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(what: str) -> None:
+    with _stats_lock:
+        _stats[what] += 1
+
+
+def cache_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def bump_data_version(*names: str) -> None:
+    """Invalidate cached responses that depend on any of `names`."""
+    for name in names:
+        updated = DataVersion.objects.filter(name=name).update(version=F("version") + 1, updated_ts=timezone.now())
+        if not updated:
+            DataVersion.objects.get_or_create(name=name, defaults={"version": 1})
+
+
+def data_versions(names: Iterable[str], request=None) -> Tuple[int, ...]:
+    return _version_info(names, request)[0]
+
+
+def _version_info(names: Iterable[str], request=None):
+    """(versions, last updated_ts) for `names`; memoized on the request so decorators share one query."""
+    names = tuple(names)
+    memo = getattr(request, "_data_versions", None) if request is not None else None
+    if memo is not None and names in memo:
+        return memo[names]
+    found = {n: (v, ts) for n, v, ts in DataVersion.objects.filter(name__in=names).values_list("name", "version", "updated_ts")}
+    versions = tuple(found.get(n, (0, None))[0] for n in names)
+    stamps = [ts for _, ts in found.values() if ts is not None]
+    info = (versions, max(stamps) if stamps else None)
+    if request is not None:
+        if memo is None:
+            memo = request._data_versions = {}
+        memo[names] = info
+    return info
+
+
+def normalized_params(request) -> Tuple[Tuple[str, str], ...]:
+    out = []
+    for key in sorted(request.GET.keys()):
+        val = (request.GET.get(key) or "").strip()
+        if not val:
+            continue
+        if key in LOWERCASE_PARAMS:
+            val = val.lower()
+        elif key in DATE_PARAMS:
+            d = parse_date(val)
+            val = d.isoformat() if d else ""
+        out.append((key, val))
+    return tuple(out)
+
+
+def hashed_key(prefix: str, parts: tuple) -> str:
+    """"<prefix>:<sha1 of repr(parts)>": short and free of spaces/quotes, so valid for memcached too."""
+    return f"{prefix}:" + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def cache_key(request, view_name: str, versions: Tuple[int, ...]) -> str:
+    return hashed_key("api", (view_name, normalized_params(request), versions))
+
+
+def cached_api(*tables: str):
+    """
+    Cache a GET view's 200 responses in the "api" cache, keyed on the view, its
+    normalized params and the DataVersion of every table it reads. A write that
+    bumps a version makes older entries unreachable; they age out of the LRU.
+    demo=1 responses are random and never cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.GET.get("demo") == "1":
+                _count("bypass")
+                return view(request, *args, **kwargs)
+
+            cache = caches[CACHE_ALIAS]
+            key = cache_key(request, view.__name__, data_versions(tables, request))
+            hit = cache.get(key)
+            if hit is not None:
+                _count("hits")
+                content, content_type = hit
+                return HttpResponse(content, content_type=content_type)
+
+            _count("misses")
+            resp = view(request, *args, **kwargs)
+            if resp.status_code == 200 and not resp.streaming:
+                cache.set(key, (resp.content, resp["Content-Type"]))
+            return resp
+        return wrapper
+    return decorator
+
+
+def conditional_api(*tables: str):
+    """
+    Strong ETag / Last-Modified for a GET view, derived from its normalized
+    params, today's date (default ranges end today) and the DataVersion of
+    `tables`. Matching If-None-Match / If-Modified-Since gets a 304 before
+    the view runs. demo=1 responses are random and get no validators.
+    """
+    def etag(request, *args, **kwargs) -> Optional[str]:
+        if request.GET.get("demo") == "1":
+            return None
+        versions, _ = _version_info(tables, request)
+        raw = repr((request.resolver_match.view_name if request.resolver_match else request.path,
+                    normalized_params(request), versions, date.today().isoformat()))
+        return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+    def last_modified(request, *args, **kwargs):
+        if request.GET.get("demo") == "1":
+            return None
+        return _version_info(tables, request)[1]
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Optional
+
+
+class DiskLRUStore:
+    """
+    Directory of files keyed by a hash of any repr()-able key, capped by entry
+    count and/or total bytes. Reads touch the file's mtime so eviction drops
+    the least recently used entries first. Writes go through a temp file +
+    os.replace, so concurrent readers never see a partial file.
+    """
+
+    def __init__(self, directory, max_entries: Optional[int] = None, max_bytes: Optional[int] = None, suffix: str = ".pkl"):
+        self.directory = str(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+
+    def path(self, key, suffix: Optional[str] = None) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest + (suffix or self.suffix))
+
+    def _touch(self, path: str) -> None:
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def lookup(self, key, suffix: Optional[str] = None) -> Optional[str]:
+        """Path of a stored entry (marked as recently used), or None."""
+        path = self.path(key, suffix)
+        if not os.path.exists(path):
+            return None
+        self._touch(path)
+        return path
+
+    def load(self, key) -> Any:
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def dump(self, key, obj) -> str:
+        return self.write_bytes(key, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def temp_path(self, suffix: str = "") -> str:
+        """Fresh temp file inside the store directory, ready to be adopt()ed."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=suffix)
+        os.close(fd)
+        return tmp
+
+    def discard(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def write_bytes(self, key, data: bytes, suffix: Optional[str] = None) -> str:
+        tmp = self.temp_path()
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self.adopt(key, tmp, suffix)
+
+    def adopt(self, key, src_path: str, suffix: Optional[str] = None) -> str:
+        """Move an already-written file (same filesystem) into the store under `key`."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key, suffix)
+        os.replace(src_path, path)
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        if self.max_entries is None and self.max_bytes is None:
+            return 0
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.startswith(".tmp-"):
+                    continue
+                p = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+            entries.sort()
+            total = sum(e[1] for e in entries)
+            removed = 0
+            while entries and (
+                (self.max_entries is not None and len(entries) > self.max_entries)
+                or (self.max_bytes is not None and total > self.max_bytes)
+            ):
+                _, size, p = entries.pop(0)
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
+
+    def clear(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
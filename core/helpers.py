@@ -1,15 +1,29 @@
 from __future__ import annotations
 from datetime import date, timedelta
-from typing import List, Dict, Tuple, Optional
+from itertools import chain
+import csv
+from typing import Iterable, List, Dict, Tuple, Optional
 import math
+import os
+import tempfile
 
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import ExtractIsoYear, ExtractMonth, ExtractWeek, ExtractYear
+from django.http import StreamingHttpResponse
 from django.utils.dateparse import parse_date
 
+from core.serializers import api_response
+
 try:
     import pandas as pd
 except Exception:
     pd = None  
 
+try:
+    from openpyxl import Workbook
+except Exception:
+    Workbook = None
+
 
 def parse_dates(request) -> Tuple[Optional[date], Optional[date]]:
     d1 = parse_date(request.GET.get("date_from") or "")
@@ -20,6 +34,30 @@ def group_param(request) -> str:
     grp = (request.GET.get("grp") or "day").lower()
     return grp if grp in ("day", "week", "month") else "day"
 
+def resorts_param(request) -> Optional[List[str]]:
+    """
+    resort=A,B,C -> ["A", "B", "C"], resort=* -> [] (every resort);
+    None when a single resort (or none) is given.
+    """
+    raw = (request.GET.get("resort") or "").strip()
+    if raw == "*":
+        return []
+    if "," not in raw:
+        return None
+    return sorted({r.strip() for r in raw.split(",") if r.strip()})
+
+def max_points_param(request) -> Optional[int]:
+    """max_points=N (at least 3) for chart downsampling; missing or invalid means no limit."""
+    try:
+        n = int(request.GET.get("max_points") or 0)
+    except ValueError:
+        return None
+    return max(n, 3) if n > 0 else None
+
+def downsample_param(request) -> str:
+    method = (request.GET.get("downsample") or "lttb").lower()
+    return method if method in ("lttb", "minmax") else "lttb"
+
 def period_key(dt: date, grp: str) -> str:
     """YYYY-MM-DD / YYYY-Www / YYYY-MM."""
     if grp == "day":
@@ -31,6 +69,91 @@ def period_key(dt: date, grp: str) -> str:
         return dt.strftime("%Y-%m")
     return dt.strftime("%Y-%m-%d")
 
+def period_rows(qs, field: str, grp: str, by: Tuple[str, ...] = (), **aggregates) -> List[dict]:
+    """
+    GROUP BY the period of `field` in the database and return
+    [{"period": <period_key>, **aggregates}, ...] sorted by period.
+    Keys match period_key(): day -> date, week -> ISO year + week, month -> year + month.
+    `by` adds leading GROUP BY columns (e.g. ("resort",)); they are copied into each row.
+    """
+    qs = qs.filter(**{f"{field}__isnull": False}).order_by()
+    if grp == "week":
+        parts = {"_p1": ExtractIsoYear(field), "_p2": ExtractWeek(field)}
+        fmt = lambda r: f"{r['_p1']}-W{r['_p2']:02d}"
+    elif grp == "month":
+        parts = {"_p1": ExtractYear(field), "_p2": ExtractMonth(field)}
+        fmt = lambda r: f"{r['_p1']}-{r['_p2']:02d}"
+    else:
+        parts = {}
+        fmt = lambda r: r[field].strftime("%Y-%m-%d")
+    if parts:
+        qs = qs.annotate(**parts).values(*by, *parts)
+    else:
+        qs = qs.values(*by, field)
+    out = []
+    for r in qs.annotate(**aggregates):
+        row = {k: r[k] for k in by}
+        row["period"] = fmt(r)
+        row.update((k, r[k]) for k in aggregates)
+        out.append(row)
+    out.sort(key=lambda r: tuple(r[k] for k in by) + (r["period"],))
+    return out
+
+STREAM_FORMATS = ("ndjson", "stream")
+STREAM_BATCH = 500   # rows serialized per chunk written to the socket
+
+def stream_format(request, default: str | None = None) -> str | None:
+    """format=ndjson|stream from the query string, else `default` (None = a regular api_response)."""
+    fmt = (request.GET.get("format") or "").lower()
+    return fmt if fmt in STREAM_FORMATS else default
+
+def _json_chunks(rows: Iterable[dict], sep: str, end: str = ""):
+    """Rows encoded STREAM_BATCH at a time, joined by `sep`; each chunk ends with `end`."""
+    enc = DjangoJSONEncoder(separators=(",", ":"))
+    buf = []
+    for row in rows:
+        buf.append(enc.encode(row))
+        if len(buf) >= STREAM_BATCH:
+            yield sep.join(buf) + end
+            buf = []
+    if buf:
+        yield sep.join(buf) + end
+
+def series_response(request, rows: Iterable[dict], key: str = "series", extra: dict | None = None,
+                    default_format: str | None = None):
+    """
+    Return `rows` as {key: [...], **extra}. By default that is api_response()
+    (so layout=columnar applies); format=stream sends the same document as a chunked JSON array and
+    format=ndjson one row per line (without `extra`), both through a
+    StreamingHttpResponse so a long iterator is never held in memory.
+    """
+    fmt = stream_format(request, default_format)
+    if fmt is None:
+        return api_response(request, {key: list(rows), **(extra or {})})
+    if fmt == "ndjson":
+        return StreamingHttpResponse(_json_chunks(rows, "\n", "\n"), content_type="application/x-ndjson")
+
+    def document():
+        enc = DjangoJSONEncoder(separators=(",", ":"))
+        yield "{" + enc.encode(key) + ":["
+        first = True
+        for chunk in _json_chunks(rows, ","):
+            yield chunk if first else "," + chunk
+            first = False
+        yield "]"
+        for k, v in (extra or {}).items():
+            yield "," + enc.encode(k) + ":" + enc.encode(v)
+        yield "}"
+    return StreamingHttpResponse(document(), content_type="application/json")
+
+LEAD_BUCKETS = ("early","standard","last_minute","very_late")
+
+def bucket_for_lead(days:int) -> str:
+    if days >= 30: return "early"
+    if 7 <= days <= 29: return "standard"
+    if 0 <= days <= 6: return "last_minute"
+    return "very_late"
+
 def ensure_range(d1: Optional[date], d2: Optional[date], default_days: int = 365) -> Tuple[date, date]:
     """Guarantee a date range; default to last N days if not provided."""
     today = date.today()
@@ -79,3 +202,61 @@ def export_excel(path: str, sheets: Dict[str, List[dict]], orders: Dict[str, Lis
             df = to_dataframe(data, (orders or {}).get(name))
             df.to_excel(writer, index=False, sheet_name=name[:31])
     return path
+
+def _excel_cell(v):
+    return str(v) if isinstance(v, (dict, list, tuple)) else v
+
+def stream_excel(sheets: Dict[str, Iterable[dict]], orders: Dict[str, List[str]] | None = None,
+                 path: str | None = None) -> str:
+    """
+    Same layout as export_excel, but rows are consumed one at a time into an
+    openpyxl write-only workbook, so memory stays flat however long the sheets
+    are. Writes to `path` or a fresh temp file and returns the path.
+    """
+    if Workbook is None:
+        raise RuntimeError("openpyxl required to export Excel. pip install openpyxl")
+    wb = Workbook(write_only=True)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(title=name[:31])
+        it = iter(rows)
+        first = next(it, None)
+        if first is None:
+            continue
+        cols = _sheet_columns(first, (orders or {}).get(name))
+        ws.append(cols)
+        for row in chain([first], it):
+            ws.append([_excel_cell(row.get(c)) for c in cols])
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="export-", suffix=".xlsx")
+        os.close(fd)
+    wb.save(path)
+    return path
+
+def _sheet_columns(first: dict, order: List[str] | None) -> List[str]:
+    return [c for c in order if c in first] if order else list(first)
+
+def stream_csv(rows: Iterable[dict], path: str, order: List[str] | None = None) -> str:
+    """One sheet as CSV, row by row; nested values are written like the Excel export."""
+    it = iter(rows)
+    first = next(it, None)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if first is None:
+            return path
+        cols = _sheet_columns(first, order)
+        w = csv.writer(f)
+        w.writerow(cols)
+        for row in chain([first], it):
+            w.writerow([_excel_cell(row.get(c)) for c in cols])
+    return path
+
+def write_parquet(rows: Iterable[dict], path: str, order: List[str] | None = None) -> str:
+    """One sheet as a Parquet file (pandas + pyarrow); nested dicts become struct columns."""
+    if pd is None:
+        raise RuntimeError("pandas and pyarrow required to export Parquet. pip install pandas pyarrow")
+    rows = list(rows)
+    cols = _sheet_columns(rows[0], order) if rows else (order or [])
+    try:
+        pd.DataFrame(rows, columns=cols).to_parquet(path, index=False)
+    except ImportError as e:
+        raise RuntimeError("pyarrow required to export Parquet. pip install pyarrow") from e
+    return path
@@ -0,0 +1,161 @@
+from __future__ import annotations
+import json
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Tuple
+
+import django
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# kind -> dotted path of a callable(params: dict) -> JSON-serializable result
+JOB_HANDLERS = {
+    "forecast": "core.services.forecast_service.forecast_job",
+    "batch_export": "core.services.export_service.batch_export_job",
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+_current_job_id = None   # set in the worker while run_job executes a handler
+
+
+def _init_worker():
+    django.setup()
+    from django.db import connections
+    connections.close_all()   # never share the parent's DB handles after fork
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, "JOB_WORKERS", 2),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def job_key(kind: str, params: dict) -> str:
+    """"<kind>:<sha1>" of the canonical params: bounded length however long the params get."""
+    from core.cache import hashed_key
+    return hashed_key(kind, (json.dumps(params, sort_keys=True, default=str),))
+
+
+def _heartbeat(job_id: int, stop: threading.Event) -> None:
+    from django.db import connection
+    from django.utils import timezone
+    from core.models import BackgroundJob
+
+    try:
+        while not stop.wait(getattr(settings, "JOB_HEARTBEAT_SECONDS", 15)):
+            BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.RUNNING).update(heartbeat_ts=timezone.now())
+    finally:
+        connection.close()
+
+
+def run_job(job_id: int) -> None:
+    """Worker entry point: execute one BackgroundJob and store its outcome."""
+    from django.utils import timezone
+    from core.models import BackgroundJob
+
+    global _current_job_id
+    job = BackgroundJob.objects.get(pk=job_id)
+    started = BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.PENDING).update(
+        status=BackgroundJob.RUNNING, heartbeat_ts=timezone.now(),
+    )
+    if not started:
+        return   # given up as orphaned before a worker reached it
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True).start()
+    _current_job_id = job_id
+    try:
+        result = import_string(JOB_HANDLERS[job.kind])(job.params)
+    except Exception:
+        BackgroundJob.objects.filter(pk=job_id).update(
+            status=BackgroundJob.FAILED, error=traceback.format_exc(limit=5), finished_ts=timezone.now(),
+        )
+        return
+    finally:
+        _current_job_id = None
+        stop.set()
+    BackgroundJob.objects.filter(pk=job_id).update(
+        status=BackgroundJob.DONE, result=result, finished_ts=timezone.now(),
+    )
+
+
+def report_progress(**progress) -> None:
+    """Store `progress` on the job the calling handler runs under; a no-op outside run_job."""
+    if _current_job_id is None:
+        return
+    from core.models import BackgroundJob
+    BackgroundJob.objects.filter(pk=_current_job_id).update(progress=progress)
+
+
+def _record_crash(job_id: int, future) -> None:
+    exc = future.exception()
+    if exc is None:
+        return
+    from django.utils import timezone
+    from core.models import BackgroundJob
+    BackgroundJob.objects.filter(pk=job_id, status__in=(BackgroundJob.PENDING, BackgroundJob.RUNNING)).update(
+        status=BackgroundJob.FAILED, error=repr(exc), finished_ts=timezone.now(),
+    )
+
+
+def fail_orphaned_jobs(key: str) -> int:
+    """
+    Mark PENDING/RUNNING jobs for `key` FAILED when nothing has touched them
+    for JOB_STALE_SECONDS: a running job's worker heartbeats, so silence means
+    its process is gone. Returns the number of jobs given up.
+    """
+    from django.db.models import Q
+    from django.utils import timezone
+    from core.models import BackgroundJob
+
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, "JOB_STALE_SECONDS", 300))
+    return BackgroundJob.objects.filter(
+        Q(status=BackgroundJob.PENDING, created_ts__lt=cutoff)
+        | Q(status=BackgroundJob.RUNNING, heartbeat_ts__lt=cutoff)
+        | Q(status=BackgroundJob.RUNNING, heartbeat_ts__isnull=True, created_ts__lt=cutoff),
+        key=key,
+    ).update(status=BackgroundJob.FAILED, error="orphaned: no worker heartbeat", finished_ts=now)
+
+
+def submit_job(kind: str, params: dict) -> Tuple["BackgroundJob", bool]:
+    """
+    Queue `kind` with `params` on the process pool. An identical job that is
+    still pending/running is returned instead of starting a new one, unless
+    it has gone stale (see fail_orphaned_jobs). Returns (job, deduplicated).
+    """
+    from core.models import BackgroundJob
+
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"unknown job kind: {kind}")
+    key = job_key(kind, params)
+    fail_orphaned_jobs(key)
+    existing = (
+        BackgroundJob.objects.filter(key=key, status__in=(BackgroundJob.PENDING, BackgroundJob.RUNNING))
+        .order_by("-id").first()
+    )
+    if existing is not None:
+        return existing, True
+
+    job = BackgroundJob.objects.create(kind=kind, key=key, params=params)
+    future = get_pool().submit(run_job, job.pk)
+    future.add_done_callback(lambda f, job_id=job.pk: _record_crash(job_id, f))
+    return job, False
+
+
+def job_payload(job) -> dict:
+    out = {"job_id": job.pk, "kind": job.kind, "status": job.status, "params": job.params}
+    if job.progress is not None:
+        out["progress"] = job.progress
+    if job.status == job.DONE:
+        out["result"] = job.result
+    elif job.status == job.FAILED:
+        out["error"] = job.error
+    return out
@@ -0,0 +1,38 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.export_service import batch_export, parse_years, FORMATS
+
+
+class Command(BaseCommand):
+    help = "Export the year sheets for many resorts and years into one zip (xlsx, csv or parquet)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", required=True, help='Years, e.g. "2021-2025" or "2022,2024"')
+        parser.add_argument("--resort", action="append", help="Limit to resort(s); repeatable (default all)")
+        parser.add_argument("--format", choices=FORMATS, default="xlsx", help="Output format (default xlsx)")
+        parser.add_argument("--workers", type=int, default=2, help="Rendering processes (default 2)")
+        parser.add_argument("--out", help="Zip path (default a new file in EXPORT_BATCH_DIR)")
+
+    def handle(self, *args, **opts):
+        try:
+            years = parse_years(opts["years"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+
+        def progress(done, total):
+            if done == total or done % 10 == 0:
+                self.stdout.write(f"  {done}/{total} ({time.perf_counter() - started:.1f}s)")
+
+        res = batch_export(opts["resort"], years, fmt=opts["format"], workers=max(1, opts["workers"]),
+                           path=opts["out"], progress=progress)
+        out = opts["out"] or os.path.join(str(settings.EXPORT_BATCH_DIR), res["file"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {res['files']} file(s) for {res['parts']} resort-year pair(s) "
+            f"({res['bytes'] / 1e6:.1f} MB) in {res['seconds']:.2f}s -> {out}"
+        ))
@@ -1,26 +1,60 @@
-from django.core.management.base import BaseCommand
-from core.models_ft import FinancialTransaction as FT
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from core.models_ft import FinancialTransaction as FT, FTIngestWatermark, FTDailyRollup
+from core.cache import bump_data_version
+from core.services.rollup_service import refresh_daily_rollup, ft_rollup_years, year_versions
+from core.services import columnar_service
 import csv
-from datetime import datetime
+import glob
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+
+import django
 
 DATE_FMT = "%Y-%m-%d"
 DATETIME_FMT = "%Y-%m-%d %H:%M:%S"
+PARSE_CACHE_SIZE = 8192
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_date(s):
     if not s: return None
+    try:
+        return date.fromisoformat(s[:10])
+    except ValueError:
+        pass
     try:
         return datetime.strptime(s[:10], DATE_FMT).date()
     except Exception:
         return None
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_dt(s):
+    """Parse to an aware datetime in the default timezone (what Django would assume on save)."""
     if not s: return None
-    for fmt in (DATETIME_FMT, "%Y-%m-%dT%H:%M:%S"):
+    dt = None
+    if len(s) >= 19 and s[10] in " T":
         try:
-            return datetime.strptime(s[:19], fmt)
-        except Exception:
+            dt = datetime.fromisoformat(s[:19])
+        except ValueError:
             pass
-    return None
+    if dt is None:
+        for fmt in (DATETIME_FMT, "%Y-%m-%dT%H:%M:%S"):
+            try:
+                dt = datetime.strptime(s[:19], fmt)
+                break
+            except Exception:
+                pass
+    if dt is None:
+        return None
+    return timezone.make_aware(dt) if settings.USE_TZ else dt
 
 def to_decimal(s):
     if s in (None, "", "NULL"): return None
@@ -29,118 +63,294 @@ def to_decimal(s):
     except Exception:
         return None
 
+def to_int(s):
+    return int(s) if s else None
+
+def to_str(s):
+    return s or None
+
+CONVERTERS = {
+    "BigIntegerField": to_int,
+    "IntegerField": to_int,
+    "SmallIntegerField": to_int,
+    "DateField": parse_date,
+    "DateTimeField": parse_dt,
+    "DecimalField": to_decimal,
+    "FloatField": to_decimal,
+}
+
+# (column name, converter) per concrete field, in the order FT(*values) expects.
+COLUMNS = tuple(
+    (f.attname, int if f.primary_key else CONVERTERS.get(f.get_internal_type(), to_str))
+    for f in FT._meta.concrete_fields
+)
+
+def compile_header(header):
+    """Map CSV header -> per-field (source index, converter); unknown columns are ignored."""
+    if "pkid" not in header:
+        raise CommandError("CSV header has no pkid column")
+    pos = {name: i for i, name in enumerate(header)}
+    return tuple((pos.get(name), conv) for name, conv in COLUMNS)
+
+def row_values(plan, r):
+    """Convert one raw CSV row to a tuple of field values (model field order)."""
+    n = len(r)
+    return tuple(
+        conv(r[i]) if i is not None and i < n else None
+        for i, conv in plan
+    )
+
+def chunked(rows, size):
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+def resolve_paths(specs):
+    """Expand each argument as a directory (*.csv inside), a glob pattern or a plain file."""
+    paths = []
+    for spec in specs:
+        if os.path.isdir(spec):
+            paths.extend(sorted(glob.glob(os.path.join(spec, "*.csv"))))
+        elif any(c in spec for c in "*?["):
+            paths.extend(sorted(glob.glob(spec)))
+        else:
+            paths.append(spec)
+    return paths
+
+def raw_chunks(paths, size):
+    """Yield (header, [row, ...]) chunks of raw CSV rows across all files."""
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                continue
+            for rows in chunked(reader, size):
+                yield header, rows
+
+def convert_chunk(header, rows):
+    """Turn raw CSV rows into field-value tuples (model field order)."""
+    plan = compile_header(header)
+    return [row_values(plan, r) for r in rows]
+
+def record_ranges(path, size):
+    """
+    Yield (start, end) byte ranges of `size` CSV records each, after the
+    header, without tokenizing: a line ends a record once the quotes seen so
+    far are balanced, so quoted fields spanning lines stay in one range.
+    """
+    with open(path, "rb") as f:
+        pos = start = rows = quotes = 0
+        in_header = True
+        for line in f:
+            pos += len(line)
+            quotes += line.count(b'"')
+            if quotes % 2:
+                continue
+            if in_header:
+                in_header = False
+                start = pos
+                continue
+            rows += 1
+            if rows == size:
+                yield start, pos
+                start, rows = pos, 0
+        if rows:
+            yield start, pos
+
+def read_header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
+def convert_range(path, header, start, end):
+    """Worker entry point: read, tokenize and convert one byte range of whole records."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    return convert_chunk(header, csv.reader(io.StringIO(text, newline="")))
+
+def converted_batches(paths, size, workers):
+    """
+    Yield converted batches in file order. With workers > 1 every file is
+    cut into ranges of `size` records (record_ranges) and each worker reads,
+    tokenizes and converts its own range, so one large file is spread over
+    the pool and only converted tuples come back. At most 2 * workers ranges
+    are in flight, so memory stays bounded by the batch size whatever the
+    file sizes; results are consumed here so DB writes stay on one connection.
+    """
+    if workers <= 1:
+        for header, rows in raw_chunks(paths, size):
+            yield [FT(*v) for v in convert_chunk(header, rows)]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        pending = deque()
+        for path in paths:
+            header = read_header(path)
+            if header is None:
+                continue
+            for start, end in record_ranges(path, size):
+                pending.append(pool.submit(convert_range, path, header, start, end))
+                if len(pending) >= 2 * workers:
+                    yield [FT(*v) for v in pending.popleft().result()]
+        while pending:
+            yield [FT(*v) for v in pending.popleft().result()]
+
+UPSERT_FIELDS = [f.name for f in FT._meta.concrete_fields if not f.primary_key]
+
+def _aware(dt):
+    if dt is not None and timezone.is_naive(dt):
+        return timezone.make_aware(dt)
+    return dt
+
+def _older(dt, ref):
+    """True if `dt` is known to be older than `ref` (None never compares older)."""
+    return dt is not None and ref is not None and dt < ref
+
+def newer_only(objs):
+    """
+    Keep rows that would change the table: not yet stored, or carrying a newer
+    jrn_update_dttm than the stored copy. Decided per pkid against its own
+    stored row; the resort watermark says nothing about whether a pkid exists
+    or how old its stored copy is. Returns (kept, skipped, replaced dates).
+    """
+    latest = {}
+    for o in objs:
+        o.jrn_update_dttm = _aware(o.jrn_update_dttm)
+        cur = latest.get(o.pkid)
+        if cur is None or not _older(o.jrn_update_dttm, cur.jrn_update_dttm):
+            latest[o.pkid] = o
+    candidates = list(latest.values())
+
+    stored = {}
+    for pks in chunked([o.pkid for o in candidates], 500):
+        stored.update(
+            (pk, (dttm, bdate))
+            for pk, dttm, bdate in FT.objects.filter(pkid__in=pks).values_list("pkid", "jrn_update_dttm", "business_date")
+        )
+
+    kept = []
+    replaced_dates = set()
+    for o in candidates:
+        if o.pkid in stored:
+            prev, prev_date = stored[o.pkid]
+            if prev is not None and (o.jrn_update_dttm is None or o.jrn_update_dttm <= prev):
+                continue
+            replaced_dates.add(prev_date)
+        kept.append(o)
+    return kept, len(objs) - len(kept), replaced_dates
+
+def stored_dates(objs):
+    """business_date of the stored rows `objs` will overwrite (their rollup days change too)."""
+    dates = set()
+    for pks in chunked([o.pkid for o in objs], 500):
+        dates.update(FT.objects.filter(pkid__in=pks).values_list("business_date", flat=True).distinct())
+    return dates
+
+def upsert(objs, batch_size):
+    """INSERT ... ON CONFLICT(pkid) DO UPDATE, so re-loading a file updates rows like save() did."""
+    with transaction.atomic():
+        FT.objects.bulk_create(objs, batch_size=batch_size, update_conflicts=True,
+                               unique_fields=["pkid"], update_fields=UPSERT_FIELDS)
+
 class Command(BaseCommand):
-    help = "Load FinancialTransaction rows from a CSV (headers must match model field names)."
+    help = "Load FinancialTransaction rows from CSV files (headers must match model field names)."
 
     def add_arguments(self, parser):
-        parser.add_argument("csv_path", type=str)
+        parser.add_argument("csv_path", nargs="+", type=str,
+                            help="CSV file(s), directories of *.csv or glob patterns")
         parser.add_argument("--truncate", action="store_true", help="Delete existing rows first")
+        parser.add_argument("--batch-size", type=int, default=2000,
+                            help="Rows per bulk INSERT / transaction (default 2000)")
+        parser.add_argument("--incremental", action="store_true",
+                            help="Upsert by pkid; skip rows not newer (jrn_update_dttm) than the stored row. "
+                                 "Per-resort high-water marks are recorded in ft_ingest_watermark")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Processes parsing CSV record ranges in parallel (default 1 = in-process)")
 
     def handle(self, *args, **opts):
-        path = opts["csv_path"]
+        paths = resolve_paths(opts["csv_path"])
+        if not paths:
+            raise CommandError(f"No CSV files matched {' '.join(opts['csv_path'])}")
+        missing = [p for p in paths if not os.path.isfile(p)]
+        if missing:
+            raise CommandError(f"CSV file not found: {missing[0]}")
         truncate = opts["truncate"]
+        batch_size = max(1, opts["batch_size"])
+        incremental = opts["incremental"]
+        if incremental and truncate:
+            raise CommandError("--incremental and --truncate are mutually exclusive")
+
+        # an up-to-date Parquet snapshot only needs the touched months rewritten
+        snapshot_incremental = columnar_service.enabled() and not truncate and columnar_service.snapshot_current()
 
         if truncate:
             self.stdout.write("Truncating financial_transaction ...")
+            years = ft_rollup_years()
             FT.objects.all().delete()
+            FTDailyRollup.objects.all().delete()
+            bump_data_version("ft", *year_versions("ft", years))
 
         count = 0
-        with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                obj = FT(
-                    pkid=int(row["pkid"]),
-                    organizationid=int(row["organizationid"]) if row.get("organizationid") else None,
-                    dsi=int(row["dsi"]) if row.get("dsi") else None,
-                    resort=row.get("resort") or None,
-                    locationid=row.get("locationid") or None,
-                    trx_no=int(row["trx_no"]) if row.get("trx_no") else None,
-                    fintransactionid=int(row["fintransactionid"]) if row.get("fintransactionid") else None,
-                    reservationid=int(row["reservationid"]) if row.get("reservationid") else None,
-                    parentfintransid=int(row["parentfintransid"]) if row.get("parentfintransid") else None,
-                    depositlinkfintransid=int(row["depositlinkfintransid"]) if row.get("depositlinkfintransid") else None,
-                    packagelinkfintransid=int(row["packagelinkfintransid"]) if row.get("packagelinkfintransid") else None,
-                    profileid=int(row["profileid"]) if row.get("profileid") else None,
-                    cashierid=int(row["cashierid"]) if row.get("cashierid") else None,
-                    authemployeeid=int(row["authemployeeid"]) if row.get("authemployeeid") else None,
-                    accountid=row.get("accountid") or None,
-                    room=row.get("room") or None,
-                    roomid=row.get("roomid") or None,
-                    folio_no=row.get("folio_no") or None,
-                    folio_type=row.get("folio_type") or None,
-                    org_folio_type=row.get("org_folio_type") or None,
-                    business_date=parse_date(row.get("business_date")),
-                    trx_date=parse_dt(row.get("trx_date")),
-                    posting_date=parse_dt(row.get("posting_date")),
-                    transaction_posting_date=parse_date(row.get("transaction_posting_date")),
-                    insert_date=parse_dt(row.get("insert_date")),
-                    ar_transfer_date=parse_dt(row.get("ar_transfer_date")),
-                    jrn_update_dttm=parse_dt(row.get("jrn_update_dttm")),
-                    jrn_update_date=parse_date(row.get("jrn_update_date")),
-                    trx_code=row.get("trx_code") or None,
-                    ft_subtype=row.get("ft_subtype") or None,
-                    trx_type=row.get("trx_type") or None,
-                    transaction_status=row.get("transaction_status") or None,
-                    rate_code=row.get("rate_code") or None,
-                    market_code=row.get("market_code") or None,
-                    source_code=row.get("source_code") or None,
-                    tc_group=row.get("tc_group") or None,
-                    tc_subgroup=row.get("tc_subgroup") or None,
-                    product=row.get("product") or None,
-                    currency=row.get("currency") or None,
-                    contract_currency=row.get("contract_currency") or None,
-                    parallel_currency=row.get("parallel_currency") or None,
-                    exchange_rate=to_decimal(row.get("exchange_rate")),
-                    euro_exchange_rate=to_decimal(row.get("euro_exchange_rate")),
-                    exchange_date=parse_dt(row.get("exchange_date")),
-                    exchange_type=row.get("exchange_type") or None,
-                    price_per_unit=to_decimal(row.get("price_per_unit")),
-                    quantity=to_decimal(row.get("quantity")),
-                    posted_amount=to_decimal(row.get("posted_amount")),
-                    trx_amount=to_decimal(row.get("trx_amount")),
-                    cc_trx_fee_amount=to_decimal(row.get("cc_trx_fee_amount")),
-                    gross_amount=to_decimal(row.get("gross_amount")),
-                    net_amount=to_decimal(row.get("net_amount")),
-                    revenue_amt=to_decimal(row.get("revenue_amt")),
-                    non_revenue_amount=to_decimal(row.get("non_revenue_amount")),
-                    vat_amount=to_decimal(row.get("vat_amount")),
-                    c_vat_amount=to_decimal(row.get("c_vat_amount")),
-                    guest_account_credit=to_decimal(row.get("guest_account_credit")),
-                    guest_account_debit=to_decimal(row.get("guest_account_debit")),
-                    cashier_credit=to_decimal(row.get("cashier_credit")),
-                    cashier_debit=to_decimal(row.get("cashier_debit")),
-                    package_credit=to_decimal(row.get("package_credit")),
-                    package_debit=to_decimal(row.get("package_debit")),
-                    dep_led_credit=to_decimal(row.get("dep_led_credit")),
-                    dep_led_debit=to_decimal(row.get("dep_led_debit")),
-                    ar_led_credit=to_decimal(row.get("ar_led_credit")),
-                    ar_led_debit=to_decimal(row.get("ar_led_debit")),
-                    iscreditflag=(row.get("iscreditflag") or None),
-                    isdebitflag=(row.get("isdebitflag") or None),
-                    taxinclusiveflag=(row.get("taxinclusiveflag") or None),
-                    taxgeneratedflag=(row.get("taxgeneratedflag") or None),
-                    taxdeferredflag=(row.get("taxdeferredflag") or None),
-                    deferred_yn=(row.get("deferred_yn") or None),
-                    processed8300flag=(row.get("processed8300flag") or None),
-                    fixedchargesflag=(row.get("fixedchargesflag") or None),
-                    tacommissionableflag=(row.get("tacommissionableflag") or None),
-                    onholdflag=(row.get("onholdflag") or None),
-                    adjustmentflag=(row.get("adjustmentflag") or None),
-                    displayflag=(row.get("displayflag") or None),
-                    archargetransferflag=(row.get("archargetransferflag") or None),
-                    deleted_flag=(row.get("deleted_flag") or None),
-                    settlement_flag=(row.get("settlement_flag") or None),
-                    country_code=row.get("country_code") or None,
-                    country=row.get("country") or None,
-                    rep_tc_group=row.get("rep_tc_group") or None,
-                    tc_group_desc=row.get("tc_group_desc") or None,
-                    rep_tc_subgroup=row.get("rep_tc_subgroup") or None,
-                    tc_subgroup_desc=row.get("tc_subgroup_desc") or None,
-                    rep_trx_code=row.get("rep_trx_code") or None,
-                    trx_code_desc=row.get("trx_code_desc") or None,
-                    rep_product=row.get("rep_product") or None,
-                )
-                obj.save()
-                count += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Loaded {count} rows into financial_transaction"))
+        skipped = 0
+        seen = {}  # resort -> [max jrn_update_dttm, rows written]
+        touched_dates = set()
+        workers = max(1, opts["workers"])
+        started = time.perf_counter()
+        try:
+            for objs in converted_batches(paths, batch_size, workers):
+                if incremental:
+                    objs, dropped, batch_dates = newer_only(objs)
+                    skipped += dropped
+                    upsert(objs, batch_size)
+                    for o in objs:
+                        mark = seen.setdefault(o.resort or "", [None, 0])
+                        if o.jrn_update_dttm is not None and (mark[0] is None or o.jrn_update_dttm > mark[0]):
+                            mark[0] = o.jrn_update_dttm
+                        mark[1] += 1
+                else:
+                    objs = list({o.pkid: o for o in objs}.values())   # last copy of a pkid wins, as with save()
+                    batch_dates = set() if truncate else stored_dates(objs)
+                    upsert(objs, batch_size)
+                # only now that the batch has committed do its days need a rollup refresh
+                touched_dates |= batch_dates
+                touched_dates.update(o.business_date for o in objs)
+                count += len(objs)
+                if opts["verbosity"] > 1:
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"  {count} rows ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+        finally:
+            # batches commit one by one: even when a later one fails, bring the
+            # rollup and the data versions in line with the batches that committed
+            rolled = refresh_daily_rollup(touched_dates)
+        if incremental:
+            self._save_watermarks(seen)   # a failed load leaves the high-water marks where they were
+
+        snap_rows = None
+        if columnar_service.enabled():
+            snap_rows = columnar_service.refresh_snapshot(touched_dates if snapshot_incremental else None)
+
+        elapsed = time.perf_counter() - started
+        rate = count / max(elapsed, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {count} rows from {len(paths)} file(s) into financial_transaction in {elapsed:.2f}s "
+            f"({rate:,.0f} rows/s, batch={batch_size}, workers={workers})"
+        ))
+        self.stdout.write(f"Refreshed {rolled} ft_daily_rollup rows for {len(touched_dates)} business date(s)")
+        if snap_rows is not None:
+            self.stdout.write(f"Rewrote {snap_rows} rows of the Parquet snapshot "
+                              f"({'touched months' if snapshot_incremental else 'full rebuild'})")
+        if incremental:
+            self.stdout.write(f"Skipped {skipped} unchanged/stale rows; watermarks updated for {len(seen)} resort(s)")
+
+    @transaction.atomic
+    def _save_watermarks(self, seen):
+        for resort, (mark, rows) in seen.items():
+            wm, _ = FTIngestWatermark.objects.select_for_update().get_or_create(resort=resort)
+            if mark is not None and (wm.last_jrn_update_dttm is None or mark > wm.last_jrn_update_dttm):
+                wm.last_jrn_update_dttm = mark
+            wm.rows_loaded += rows
+            wm.save()
@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+
+from core.cache import data_versions
+from core.services.forecast_service import training_window, forecast_values, save_precomputed
+from core.services.revenue_service import revenue_series_by_resort
+from core.services.rollup_service import rollup_qs
+
+
+def _fit_one(resort, d1, d2, series, horizon, version):
+    started = time.perf_counter()
+    values = forecast_values(resort, d1, d2, series, horizon, version)
+    return values, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Fit the revenue forecast for every resort in parallel and store it in revenue_forecast."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=12, help="Training window (default 12)")
+        parser.add_argument("--horizon", type=int, default=56, help="Days to forecast (default 56)")
+        parser.add_argument("--workers", type=int, default=2, help="Fitting processes (default 2)")
+        parser.add_argument("--resort", action="append", help="Limit to resort(s); repeatable")
+
+    def handle(self, *args, **opts):
+        d1, d2 = training_window(opts["months"])
+        horizon = opts["horizon"]
+        version = data_versions(("ft",))[0]
+
+        started = time.perf_counter()
+        series_by_resort = revenue_series_by_resort(d1, d2, opts["resort"])
+        self.stdout.write(
+            f"Loaded {len(series_by_resort)} resort series {d1}..{d2} in {time.perf_counter() - started:.2f}s"
+        )
+        wanted = set(opts["resort"] or rollup_qs().filter(resort__isnull=False).values_list("resort", flat=True).distinct())
+        no_data = sorted(wanted - set(series_by_resort))
+        if no_data:
+            self.stdout.write(self.style.WARNING(f"No revenue in {d1}..{d2}, skipped: {', '.join(no_data)}"))
+
+        failures = {}
+        ok = 0
+        with ProcessPoolExecutor(max_workers=max(1, opts["workers"]), initializer=django.setup) as pool:
+            futures = {
+                pool.submit(_fit_one, resort, d1, d2, series, horizon, version): resort
+                for resort, series in series_by_resort.items()
+            }
+            for fut in as_completed(futures):
+                resort = futures[fut]
+                try:
+                    values, secs = fut.result()
+                    save_precomputed(resort, d1, d2, version, values)
+                except Exception as e:
+                    failures[resort] = repr(e)
+                    self.stderr.write(f"  {resort:<12} FAILED {e!r}")
+                    continue
+                ok += 1
+                self.stdout.write(f"  {resort:<12} {secs:6.2f}s")
+
+        total = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored forecasts for {ok} resort(s) in {total:.2f}s"
+            + (f"; {len(no_data)} skipped without data" if no_data else "")
+        ))
+        if failures:
+            self.stderr.write(self.style.ERROR(f"{len(failures)} resort(s) failed: {', '.join(sorted(failures))}"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.services.rollup_service import rebuild_booking_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild booking_daily_rollup from the whole booking table (needed after bulk/raw writes)."
+
+    def handle(self, *args, **opts):
+        n = rebuild_booking_rollup()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt booking_daily_rollup with {n} rows"))
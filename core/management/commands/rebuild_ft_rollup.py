@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.services.rollup_service import rebuild_daily_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild ft_daily_rollup from the whole financial_transaction table."
+
+    def handle(self, *args, **opts):
+        n = rebuild_daily_rollup()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ft_daily_rollup with {n} rows"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.services import columnar_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Parquet snapshot of financial_transaction used by FT_ANALYTICS_BACKEND=\"duckdb\"."
+
+    def handle(self, *args, **opts):
+        if not columnar_service.available():
+            raise CommandError("duckdb and pyarrow required. pip install duckdb pyarrow")
+        n = columnar_service.refresh_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {n} rows to the Parquet snapshot"))
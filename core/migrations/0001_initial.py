@@ -0,0 +1,242 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checkin_date', models.DateField(unique=True)),
+                ('total', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+                ('no_show', models.IntegerField(default=0)),
+                ('confirmed', models.IntegerField(default=0)),
+                ('lead_early', models.IntegerField(default=0)),
+                ('lead_standard', models.IntegerField(default=0)),
+                ('lead_last_minute', models.IntegerField(default=0)),
+                ('lead_very_late', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'booking_daily_rollup',
+            },
+        ),
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_ts', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'data_version',
+            },
+        ),
+        migrations.CreateModel(
+            name='FTIngestWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resort', models.CharField(max_length=32, unique=True)),
+                ('last_jrn_update_dttm', models.DateTimeField(blank=True, null=True)),
+                ('rows_loaded', models.BigIntegerField(default=0)),
+                ('updated_ts', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'ft_ingest_watermark',
+            },
+        ),
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('key', models.CharField(max_length=64)),
+                ('params', models.JSONField(default=dict)),
+                ('status', models.CharField(default='PENDING', max_length=10)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('progress', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_ts', models.DateTimeField(auto_now_add=True)),
+                ('finished_ts', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_ts', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'background_job',
+                'indexes': [models.Index(fields=['key', 'status'], name='background__key_0488b5_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checkin_date', models.DateField()),
+                ('created_ts', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(default='CONFIRMED', max_length=30)),
+                ('cancellation_flag', models.BooleanField(default=False)),
+                ('no_show_flag', models.BooleanField(default=False)),
+                ('customer_id', models.CharField(blank=True, max_length=50, null=True)),
+            ],
+            options={
+                'db_table': 'booking',
+                'indexes': [models.Index(fields=['checkin_date'], name='booking_checkin_fdfe85_idx'), models.Index(fields=['status'], name='booking_status_b99f68_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FinancialTransaction',
+            fields=[
+                ('pkid', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('organizationid', models.BigIntegerField(blank=True, null=True)),
+                ('dsi', models.BigIntegerField(blank=True, null=True)),
+                ('resort', models.CharField(blank=True, max_length=32, null=True)),
+                ('locationid', models.CharField(blank=True, max_length=32, null=True)),
+                ('trx_no', models.BigIntegerField(blank=True, null=True)),
+                ('fintransactionid', models.BigIntegerField(blank=True, null=True)),
+                ('reservationid', models.BigIntegerField(blank=True, null=True)),
+                ('parentfintransid', models.BigIntegerField(blank=True, null=True)),
+                ('depositlinkfintransid', models.BigIntegerField(blank=True, null=True)),
+                ('packagelinkfintransid', models.BigIntegerField(blank=True, null=True)),
+                ('profileid', models.BigIntegerField(blank=True, null=True)),
+                ('cashierid', models.BigIntegerField(blank=True, null=True)),
+                ('authemployeeid', models.BigIntegerField(blank=True, null=True)),
+                ('accountid', models.CharField(blank=True, max_length=64, null=True)),
+                ('room', models.CharField(blank=True, max_length=32, null=True)),
+                ('roomid', models.CharField(blank=True, max_length=32, null=True)),
+                ('folio_no', models.CharField(blank=True, max_length=64, null=True)),
+                ('folio_type', models.CharField(blank=True, max_length=32, null=True)),
+                ('org_folio_type', models.CharField(blank=True, max_length=32, null=True)),
+                ('business_date', models.DateField(blank=True, null=True)),
+                ('trx_date', models.DateTimeField(blank=True, null=True)),
+                ('posting_date', models.DateTimeField(blank=True, null=True)),
+                ('transaction_posting_date', models.DateField(blank=True, null=True)),
+                ('insert_date', models.DateTimeField(blank=True, null=True)),
+                ('ar_transfer_date', models.DateTimeField(blank=True, null=True)),
+                ('jrn_update_dttm', models.DateTimeField(blank=True, null=True)),
+                ('jrn_update_date', models.DateField(blank=True, null=True)),
+                ('trx_code', models.CharField(blank=True, max_length=32, null=True)),
+                ('ft_subtype', models.CharField(blank=True, max_length=8, null=True)),
+                ('trx_type', models.CharField(blank=True, max_length=16, null=True)),
+                ('transaction_status', models.CharField(blank=True, max_length=16, null=True)),
+                ('rate_code', models.CharField(blank=True, max_length=64, null=True)),
+                ('market_code', models.CharField(blank=True, max_length=64, null=True)),
+                ('source_code', models.CharField(blank=True, max_length=64, null=True)),
+                ('tc_group', models.CharField(blank=True, max_length=64, null=True)),
+                ('tc_subgroup', models.CharField(blank=True, max_length=64, null=True)),
+                ('product', models.CharField(blank=True, max_length=64, null=True)),
+                ('currency', models.CharField(blank=True, max_length=16, null=True)),
+                ('contract_currency', models.CharField(blank=True, max_length=16, null=True)),
+                ('parallel_currency', models.CharField(blank=True, max_length=16, null=True)),
+                ('exchange_rate', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('euro_exchange_rate', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('exchange_date', models.DateTimeField(blank=True, null=True)),
+                ('exchange_type', models.CharField(blank=True, max_length=32, null=True)),
+                ('price_per_unit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('quantity', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('posted_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('trx_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('cc_trx_fee_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('gross_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('net_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('revenue_amt', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('non_revenue_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('vat_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('c_vat_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('guest_account_credit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('guest_account_debit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('cashier_credit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('cashier_debit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('package_credit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('package_debit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('dep_led_credit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('dep_led_debit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('ar_led_credit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('ar_led_debit', models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True)),
+                ('iscreditflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('isdebitflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('taxinclusiveflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('taxgeneratedflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('taxdeferredflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('deferred_yn', models.CharField(blank=True, max_length=1, null=True)),
+                ('processed8300flag', models.CharField(blank=True, max_length=1, null=True)),
+                ('fixedchargesflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('tacommissionableflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('onholdflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('adjustmentflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('displayflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('archargetransferflag', models.CharField(blank=True, max_length=1, null=True)),
+                ('deleted_flag', models.CharField(blank=True, max_length=1, null=True)),
+                ('settlement_flag', models.CharField(blank=True, max_length=1, null=True)),
+                ('country_code', models.CharField(blank=True, max_length=8, null=True)),
+                ('country', models.CharField(blank=True, max_length=64, null=True)),
+                ('rep_tc_group', models.CharField(blank=True, max_length=64, null=True)),
+                ('tc_group_desc', models.CharField(blank=True, max_length=256, null=True)),
+                ('rep_tc_subgroup', models.CharField(blank=True, max_length=64, null=True)),
+                ('tc_subgroup_desc', models.CharField(blank=True, max_length=256, null=True)),
+                ('rep_trx_code', models.CharField(blank=True, max_length=64, null=True)),
+                ('trx_code_desc', models.CharField(blank=True, max_length=256, null=True)),
+                ('rep_product', models.CharField(blank=True, max_length=64, null=True)),
+            ],
+            options={
+                'db_table': 'financial_transaction',
+                'indexes': [models.Index(fields=['business_date'], name='financial_t_busines_1cc194_idx'), models.Index(fields=['resort', 'business_date'], name='financial_t_resort_587211_idx'), models.Index(fields=['trx_code'], name='financial_t_trx_cod_091181_idx'), models.Index(fields=['tc_group'], name='financial_t_tc_grou_603a13_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FTDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resort', models.CharField(blank=True, max_length=32, null=True)),
+                ('business_date', models.DateField(blank=True, null=True)),
+                ('rows', models.BigIntegerField(default=0)),
+                ('revenue', models.DecimalField(blank=True, decimal_places=4, max_digits=24, null=True)),
+                ('revenue_or_net', models.DecimalField(blank=True, decimal_places=4, max_digits=24, null=True)),
+                ('gross', models.DecimalField(blank=True, decimal_places=4, max_digits=24, null=True)),
+                ('net', models.DecimalField(blank=True, decimal_places=4, max_digits=24, null=True)),
+                ('non_revenue', models.DecimalField(blank=True, decimal_places=4, max_digits=24, null=True)),
+            ],
+            options={
+                'db_table': 'ft_daily_rollup',
+                'indexes': [models.Index(fields=['business_date'], name='ft_daily_ro_busines_a6af60_idx'), models.Index(fields=['resort', 'business_date'], name='ft_daily_ro_resort_6b0c5c_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventoryDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('location_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('capacity', models.IntegerField(default=0)),
+                ('occupied', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'inventory_day',
+                'indexes': [models.Index(fields=['date'], name='inventory_d_date_7e47d7_idx'), models.Index(fields=['location_id'], name='inventory_d_locatio_05a8dd_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RevenueForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resort', models.CharField(max_length=32)),
+                ('train_from', models.DateField()),
+                ('train_to', models.DateField()),
+                ('data_version', models.BigIntegerField(default=0)),
+                ('model', models.CharField(default='arima(1,1,1)', max_length=32)),
+                ('date', models.DateField()),
+                ('value', models.FloatField()),
+                ('created_ts', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'revenue_forecast',
+                'indexes': [models.Index(fields=['resort', 'train_to'], name='revenue_for_resort_3e8aea_idx')],
+            },
+        ),
+    ]
@@ -37,3 +37,84 @@ class Booking(models.Model):
 
     def __str__(self):
         return f"Booking {self.id} on {self.checkin_date}"
+
+
+class BookingDailyRollup(models.Model):
+    """Per check-in date booking counts (status and lead-time buckets), kept in sync by core.signals."""
+    checkin_date = models.DateField(unique=True)
+    total = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    no_show = models.IntegerField(default=0)
+    confirmed = models.IntegerField(default=0)   # status CONFIRMED or COMPLETED
+    lead_early = models.IntegerField(default=0)
+    lead_standard = models.IntegerField(default=0)
+    lead_last_minute = models.IntegerField(default=0)
+    lead_very_late = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "booking_daily_rollup"
+
+    def __str__(self):
+        return f"{self.checkin_date}: {self.total} bookings"
+
+
+class DataVersion(models.Model):
+    """Monotonic change counter per data source ("ft", "booking", "inventory"); bumped on every write path."""
+    name = models.CharField(max_length=32, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_ts = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "data_version"
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class BackgroundJob(models.Model):
+    """A unit of heavy work (forecast fit, export, ...) run by core.jobs in a process pool."""
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+    kind = models.CharField(max_length=32)
+    key = models.CharField(max_length=64)   # kind + hash of the canonical params (core.jobs.job_key), dedupes in-flight jobs
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, default=PENDING)
+    result = models.JSONField(null=True, blank=True)
+    progress = models.JSONField(null=True, blank=True)   # handler-reported {"done", "total", ...} while RUNNING
+    error = models.TextField(blank=True, default="")
+    created_ts = models.DateTimeField(auto_now_add=True)
+    finished_ts = models.DateTimeField(null=True, blank=True)
+    heartbeat_ts = models.DateTimeField(null=True, blank=True)   # touched by the worker while RUNNING
+
+    class Meta:
+        db_table = "background_job"
+        indexes = [
+            models.Index(fields=["key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
+
+
+class RevenueForecast(models.Model):
+    """Precomputed daily revenue forecast rows written by the precompute_forecasts command."""
+    resort = models.CharField(max_length=32)
+    train_from = models.DateField()
+    train_to = models.DateField()
+    data_version = models.BigIntegerField(default=0)   # DataVersion("ft") the model was fitted on
+    model = models.CharField(max_length=32, default="arima(1,1,1)")
+    date = models.DateField()
+    value = models.FloatField()
+    created_ts = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "revenue_forecast"
+        indexes = [
+            models.Index(fields=["resort", "train_to"]),
+        ]
+
+    def __str__(self):
+        return f"{self.resort} {self.date}: {self.value:.2f}"
@@ -126,3 +126,43 @@ class FinancialTransaction(models.Model):
 
     def __str__(self):
         return f"FT {self.trx_no} @ {self.business_date} ({self.resort})"
+
+
+class FTIngestWatermark(models.Model):
+    """Per-resort high-water mark of jrn_update_dttm seen by incremental loads."""
+    resort = models.CharField(max_length=32, unique=True)   # "" for rows without a resort
+    last_jrn_update_dttm = models.DateTimeField(null=True, blank=True)
+    rows_loaded = models.BigIntegerField(default=0)
+    updated_ts = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "ft_ingest_watermark"
+
+    def __str__(self):
+        return f"{self.resort or 'N/A'} @ {self.last_jrn_update_dttm}"
+
+
+class FTDailyRollup(models.Model):
+    """
+    Per (resort, business_date) sums of financial_transaction, refreshed by load_ft_csv.
+    `revenue` keeps SUM(revenue_amt) semantics (NULL when every row is NULL);
+    `revenue_or_net` is SUM(COALESCE(revenue_amt, net_amount)) for row-level fallback.
+    """
+    resort = models.CharField(max_length=32, null=True, blank=True)
+    business_date = models.DateField(null=True, blank=True)
+    rows = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=DEC_MAX + 4, decimal_places=DEC_PLACES, null=True, blank=True)
+    revenue_or_net = models.DecimalField(max_digits=DEC_MAX + 4, decimal_places=DEC_PLACES, null=True, blank=True)
+    gross = models.DecimalField(max_digits=DEC_MAX + 4, decimal_places=DEC_PLACES, null=True, blank=True)
+    net = models.DecimalField(max_digits=DEC_MAX + 4, decimal_places=DEC_PLACES, null=True, blank=True)
+    non_revenue = models.DecimalField(max_digits=DEC_MAX + 4, decimal_places=DEC_PLACES, null=True, blank=True)
+
+    class Meta:
+        db_table = "ft_daily_rollup"
+        indexes = [
+            models.Index(fields=["business_date"]),
+            models.Index(fields=["resort", "business_date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.resort or 'N/A'} @ {self.business_date}: {self.revenue}"
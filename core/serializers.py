@@ -0,0 +1,74 @@
+from __future__ import annotations
+import json
+from functools import lru_cache
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+LAYOUTS = ("rows", "columnar")
+ROW_KEYS = ("series", "rows")   # payload keys holding a list of row dicts
+
+_django = DjangoJSONEncoder()
+
+
+def _orjson_dumps(obj) -> bytes:
+    # dates, datetimes and Decimals go through DjangoJSONEncoder so the text matches JsonResponse
+    return orjson.dumps(obj, default=_django.default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+
+
+def _json_dumps(obj) -> bytes:
+    return json.dumps(obj, cls=DjangoJSONEncoder).encode()
+
+
+SERIALIZERS = {"orjson": _orjson_dumps, "json": _json_dumps}
+
+
+@lru_cache(maxsize=None)
+def _resolve(name: str) -> Callable[[object], bytes]:
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("orjson required for API_JSON_SERIALIZER='orjson'. pip install orjson")
+    return SERIALIZERS.get(name) or import_string(name)
+
+
+def get_dumps() -> Callable[[object], bytes]:
+    """API_JSON_SERIALIZER: "auto" (orjson when installed), "orjson", "json" or a dotted path to obj -> bytes."""
+    return _resolve(getattr(settings, "API_JSON_SERIALIZER", "auto"))
+
+
+def to_columnar(rows: List[dict]) -> Dict[str, list]:
+    """[{"period": p, "revenue": r}, ...] -> {"period": [p, ...], "revenue": [r, ...]}."""
+    keys = list(dict.fromkeys(k for r in rows for k in r))
+    return {k: [r.get(k) for r in rows] for k in keys}
+
+
+def layout_param(request) -> str:
+    layout = (request.GET.get("layout") or "rows").lower()
+    return layout if layout in LAYOUTS else "rows"
+
+
+def _columnar(payload: dict) -> dict:
+    return {k: to_columnar(v) if k in ROW_KEYS and isinstance(v, list) else v for k, v in payload.items()}
+
+
+def api_response(request, payload: dict, status: int = 200) -> HttpResponse:
+    """
+    JSON response through the configured serializer. layout=columnar turns
+    the row lists under ROW_KEYS (also per resort, under "resorts") into
+    one array per field.
+    """
+    if layout_param(request) == "columnar":
+        payload = _columnar(payload)
+        if isinstance(payload.get("resorts"), dict):
+            # multi-resort payloads: {"resorts": {resort: {"series": [...]}}}
+            payload["resorts"] = {r: _columnar(v) if isinstance(v, dict) else v for r, v in payload["resorts"].items()}
+    return HttpResponse(get_dumps()(payload), content_type="application/json", status=status)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from datetime import date
+from typing import Dict, List, Sequence
+
+from django.core.cache import caches
+
+from core.cache import CACHE_ALIAS, data_versions, hashed_key
+from core.jobs import get_pool
+from core.services import fast_forecast
+from core.services.revenue_service import revenue_series
+
+CANDIDATES = ("arima", "holt_winters", "seasonal_naive", "drift")
+DEFAULT_HORIZON = 28
+DEFAULT_FOLDS = 4
+DEFAULT_STEP = 7
+
+def _arima_fold(train:List[float], horizon:int) -> List[float]:
+    """Pool worker: fit ARIMA on one fold's training slice (no DB access)."""
+    from core.services.forecast_service import _arima_deps, ARIMA_ORDER
+    pd, np, ARIMA = _arima_deps()
+    fit = ARIMA(np.asarray(train, dtype=float), order=ARIMA_ORDER).fit(method_kwargs={"warn_convergence": False})
+    return [float(v) for v in fit.forecast(steps=horizon)]
+
+def fold_origins(n:int, horizon:int, folds:int, step:int) -> List[int]:
+    """Rolling origins (training lengths), oldest first, the last one ending at the latest data."""
+    origins = [n - horizon - i * step for i in range(folds)]
+    return sorted(o for o in origins if o >= 2 * fast_forecast.SEASON)
+
+def _metrics(preds:List[List[float]], actuals:List[List[float]], horizon:int) -> dict:
+    np = fast_forecast.np
+    P = np.asarray(preds, dtype=float)
+    A = np.asarray(actuals, dtype=float)
+    err = P - A
+    rmse_h = np.sqrt((err ** 2).mean(axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ape = np.where(A != 0, np.abs(err) / np.abs(A), np.nan)
+        # MAPE per horizon step over the folds with a non-zero actual; None where there is none
+        # (nanmean would warn "Mean of empty slice" on such columns, e.g. closed days)
+        finite = np.isfinite(ape)
+        n_h = finite.sum(axis=0)
+        mape_h = np.where(n_h > 0, np.where(finite, ape, 0.0).sum(axis=0) / n_h * 100, np.nan)
+    clean = lambda xs: [round(float(x), 4) if np.isfinite(x) else None for x in xs]
+    mape_all = float(ape[finite].mean() * 100) if finite.any() else None
+    return {
+        "rmse": round(float(np.sqrt((err ** 2).mean())), 4),
+        "mape": round(mape_all, 4) if mape_all is not None else None,
+        "rmse_by_h": clean(rmse_h),
+        "mape_by_h": clean(mape_h),
+    }
+
+def _cache_key(resort, d1, d2, horizon, folds, step, models, version):
+    return hashed_key("backtest", (resort or "", d1.isoformat(), d2.isoformat(), horizon, folds, step, tuple(models), version))
+
+def backtest(resort:str|None, d1:date, d2:date, horizon:int=DEFAULT_HORIZON, folds:int=DEFAULT_FOLDS, step:int=DEFAULT_STEP,
+             models:Sequence[str]=CANDIDATES) -> Dict:
+    """
+    Rolling-origin cross-validation of the candidate models over the daily
+    revenue history. ARIMA folds are fitted on the job process pool; the
+    NumPy models run inline. Results are cached per ft DataVersion.
+    """
+    unknown = [m for m in models if m not in CANDIDATES]
+    if unknown:
+        raise ValueError(f"unknown model(s): {', '.join(unknown)}")
+    version = data_versions(("ft",))[0]
+    cache = caches[CACHE_ALIAS]
+    key = _cache_key(resort, d1, d2, horizon, folds, step, models, version)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+
+    series = revenue_series(resort, d1, d2)
+    y = [series[dt] for dt in sorted(series.keys())]
+    origins = fold_origins(len(y), horizon, folds, step)
+    result = {
+        "params": {"resort": resort, "date_from": d1.isoformat(), "date_to": d2.isoformat(),
+                   "horizon": horizon, "folds": len(origins), "step": step},
+        "models": {},
+        "best": None,
+    }
+    if not origins:
+        return result
+
+    actuals = [y[o:o + horizon] for o in origins]
+    arima_futures = []
+    if "arima" in models:
+        pool = get_pool()
+        arima_futures = [pool.submit(_arima_fold, y[:o], horizon) for o in origins]
+
+    for name in models:
+        if name == "arima":
+            continue
+        preds = [fast_forecast.forecast_matrix(y[:o], horizon, name)[0] for o in origins]
+        result["models"][name] = _metrics(preds, actuals, horizon)
+
+    if arima_futures:
+        try:
+            preds = [f.result() for f in arima_futures]
+            result["models"]["arima"] = _metrics(preds, actuals, horizon)
+        except Exception as e:
+            result["models"]["arima"] = {"error": repr(e)}
+
+    scored = {m: r["rmse"] for m, r in result["models"].items() if "rmse" in r}
+    result["best"] = min(scored, key=scored.get) if scored else None
+    cache.set(key, result)
+    return result
+
+def cached_best_model(resort:str|None, d1:date, d2:date, allowed:Sequence[str]) -> str | None:
+    """Best model among `allowed` from an already computed default backtest, without running one."""
+    version = data_versions(("ft",))[0]
+    hit = caches[CACHE_ALIAS].get(_cache_key(resort, d1, d2, DEFAULT_HORIZON, DEFAULT_FOLDS, DEFAULT_STEP, CANDIDATES, version))
+    if not hit:
+        return None
+    scored = {m: r["rmse"] for m, r in hit["models"].items() if m in allowed and "rmse" in r}
+    return min(scored, key=scored.get) if scored else None
@@ -0,0 +1,79 @@
+from __future__ import annotations
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Sequence
+
+from core.helpers import LEAD_BUCKETS, bucket_for_lead
+
+SCAN_CHUNK = 5000
+
+
+class BookingAccumulator:
+    """
+    One metric fed by scan_bookings(). `fields` lists the Booking columns
+    add() reads; result() is called once the pass is over.
+    """
+    name = ""
+    fields: Sequence[str] = ()
+
+    def add(self, row: dict) -> None:
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+
+class StatusCounts(BookingAccumulator):
+    """Per check-in date: total, cancelled, no_show and confirmed (CONFIRMED or COMPLETED)."""
+    name = "status"
+    fields = ("checkin_date", "status", "cancellation_flag", "no_show_flag")
+
+    def __init__(self):
+        self.days = defaultdict(lambda: {"total": 0, "cancelled": 0, "no_show": 0, "confirmed": 0})
+
+    def add(self, row):
+        c = self.days[row["checkin_date"]]
+        c["total"] += 1
+        if (row["status"] == "CANCELLED") or bool(row["cancellation_flag"]):
+            c["cancelled"] += 1
+        if (row["status"] == "NO_SHOW") or bool(row["no_show_flag"]):
+            c["no_show"] += 1
+        if row["status"] in ("CONFIRMED", "COMPLETED"):
+            c["confirmed"] += 1
+
+    def result(self) -> Dict[date, dict]:
+        return dict(self.days)
+
+
+class LeadTimeBuckets(BookingAccumulator):
+    """Per check-in date: bookings per lead-time bucket (days from creation to check-in)."""
+    name = "lead"
+    fields = ("checkin_date", "created_ts")
+
+    def __init__(self):
+        self.days = defaultdict(lambda: dict.fromkeys(LEAD_BUCKETS, 0))
+
+    def add(self, row):
+        dt = row["checkin_date"]
+        created = row["created_ts"].date() if isinstance(row["created_ts"], datetime) else row["created_ts"]
+        counts = self.days[dt]   # dates without a usable lead time still get a (zero) row
+        if created and dt:
+            counts[bucket_for_lead((dt - created).days)] += 1
+
+    def result(self) -> Dict[date, dict]:
+        return dict(self.days)
+
+
+def scan_bookings(qs, accumulators: Iterable[BookingAccumulator], chunk_size: int = SCAN_CHUNK) -> Dict[str, object]:
+    """
+    Stream `qs` (Booking rows) once, feeding every accumulator, and return
+    {accumulator.name: result}. Only the union of the accumulators' fields
+    is selected.
+    """
+    accumulators = list(accumulators)
+    fields = list(dict.fromkeys(f for a in accumulators for f in a.fields))
+    adders = [a.add for a in accumulators]
+    for row in qs.values(*fields).order_by().iterator(chunk_size=chunk_size):
+        for add in adders:
+            add(row)
+    return {a.name: a.result() for a in accumulators}
@@ -1,44 +1,41 @@
 from __future__ import annotations
 from datetime import date
-from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
-from core.models import Booking
 from core.helpers import ensure_range, fill_missing_dates
+from core.services.rollup_service import booking_rollup_qs
 
-def canc_noshow_series(d1:date|None, d2:date|None, basis:str="all") -> List[dict]:
+def canc_noshow_series(d1:date|None, d2:date|None, basis:str="all", days:Dict[date, object]|None=None) -> List[dict]:
+    return list(iter_canc_noshow_series(d1, d2, basis, days))
+
+def iter_canc_noshow_series(d1:date|None, d2:date|None, basis:str="all", days:Dict[date, object]|None=None) -> Iterator[dict]:
+    """`days` (rollup_service.booking_days) reuses rows another metric already read."""
     d1, d2 = ensure_range(d1, d2, default_days=365)
-    qs = Booking.objects.filter(checkin_date__gte=d1, checkin_date__lte=d2)\
-                        .values("checkin_date", "status", "cancellation_flag", "no_show_flag")
+    if days is None:
+        qs = booking_rollup_qs(d1, d2).values_list("checkin_date", "cancelled", "no_show", "total", "confirmed")
+    else:
+        qs = [(r.checkin_date, r.cancelled, r.no_show, r.total, r.confirmed) for r in days.values()]
 
-    canc = defaultdict(int)
-    nosh = defaultdict(int)
-    denom = defaultdict(int)
+    canc = {}
+    nosh = {}
+    denom = {}
 
-    for r in qs:
-        dt = r["checkin_date"]
-        is_cancel = (r["status"] == "CANCELLED") or bool(r["cancellation_flag"])
-        is_noshow = (r["status"] == "NO_SHOW") or bool(r["no_show_flag"])
-        if is_cancel: canc[dt] += 1
-        if is_noshow: nosh[dt] += 1
-        if basis == "confirmed":
-            denom[dt] += 1 if r["status"] in ("CONFIRMED","COMPLETED") else 0
-        else:
-            denom[dt] += 1
+    for dt, c, n, total, confirmed in qs:
+        canc[dt] = c
+        nosh[dt] = n
+        denom[dt] = confirmed if basis == "confirmed" else total
 
     canc = fill_missing_dates(canc, d1, d2)
     nosh = fill_missing_dates(nosh, d1, d2)
     denom = fill_missing_dates(denom, d1, d2)
 
-    out = []
     for dt in sorted(denom.keys()):
         d = denom[dt] or 1
-        out.append({
+        yield {
             "date": dt.isoformat(),
             "denominator": int(denom[dt]),
             "cancelled": int(canc[dt]),
             "no_show": int(nosh[dt]),
             "cancel_rate": round(canc[dt]/d, 4),
             "no_show_rate": round(nosh[dt]/d, 4),
-        })
-    return out
+        }
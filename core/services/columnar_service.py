@@ -0,0 +1,224 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from core.cache import data_versions
+from core.models_ft import FinancialTransaction as FT, DEC_MAX, DEC_PLACES
+
+try:
+    import duckdb
+except Exception:
+    duckdb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pq = None
+
+# the only financial_transaction columns the analytic reads need
+AMOUNTS = ("revenue_amt", "net_amount", "gross_amount", "non_revenue_amount")
+COLUMNS = ("resort", "business_date") + AMOUNTS
+NULL_MONTH = "none"   # partition for rows without a business_date
+MANIFEST = "manifest.json"
+WRITE_CHUNK = 50_000
+
+_local = threading.local()
+
+
+def available() -> bool:
+    return duckdb is not None and pa is not None
+
+def enabled() -> bool:
+    """FT_ANALYTICS_BACKEND = "duckdb" and duckdb + pyarrow importable."""
+    return getattr(settings, "FT_ANALYTICS_BACKEND", "orm") == "duckdb" and available()
+
+def _root() -> str:
+    return str(settings.FT_SNAPSHOT_DIR)
+
+def _month_key(d: Optional[date]) -> str:
+    return d.strftime("%Y-%m") if d else NULL_MONTH
+
+def _month_bounds(key: str) -> Tuple[date, date]:
+    y, m = map(int, key.split("-"))
+    first = date(y, m, 1)
+    nxt = date(y + (m == 12), m % 12 + 1, 1)
+    return first, nxt - timedelta(days=1)
+
+def _partition_file(key: str) -> str:
+    return os.path.join(_root(), f"month={key}", "part.parquet")
+
+def _schema():
+    dec = pa.decimal128(DEC_MAX, DEC_PLACES)
+    return pa.schema([("resort", pa.string()), ("business_date", pa.date32())] + [(c, dec) for c in AMOUNTS])
+
+
+# ---------------------------------------------------------------- snapshot
+
+def _write_partition(key: str) -> int:
+    """Rewrite one month partition from financial_transaction; drops it when the month is empty."""
+    qs = FT.objects.filter(business_date__isnull=True) if key == NULL_MONTH \
+        else FT.objects.filter(business_date__range=_month_bounds(key))
+    path = _partition_file(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    os.close(fd)
+    schema = _schema()
+    n = 0
+    with pq.ParquetWriter(tmp, schema) as writer:
+        cols = [[] for _ in COLUMNS]
+        for row in qs.values_list(*COLUMNS).order_by().iterator(chunk_size=WRITE_CHUNK):
+            for i, v in enumerate(row):
+                cols[i].append(v)
+            n += 1
+            if len(cols[0]) >= WRITE_CHUNK:
+                writer.write_table(pa.table(cols, schema=schema))
+                cols = [[] for _ in COLUMNS]
+        if cols[0]:
+            writer.write_table(pa.table(cols, schema=schema))
+    if n:
+        os.replace(tmp, path)
+    else:
+        os.remove(tmp)
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    return n
+
+def _existing_months() -> List[str]:
+    if not os.path.isdir(_root()):
+        return []
+    return sorted(name.split("=", 1)[1] for name in os.listdir(_root()) if name.startswith("month="))
+
+def snapshot_version() -> Optional[int]:
+    try:
+        with open(os.path.join(_root(), MANIFEST)) as f:
+            return json.load(f)["ft_version"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def snapshot_current() -> bool:
+    """The snapshot exists and reflects the current ft DataVersion."""
+    v = snapshot_version()
+    return v is not None and v == data_versions(("ft",))[0]
+
+def refresh_snapshot(dates: Iterable[Optional[date]] | None = None) -> int:
+    """
+    Rewrite the month partitions covering `dates` (None = rows without a
+    date), or rebuild every partition when `dates` is None. Stamps the
+    snapshot with the current ft DataVersion; returns rows written.
+    """
+    if dates is None:
+        months = set(_existing_months())
+        months.update(_month_key(d) for d in FT.objects.dates("business_date", "month"))
+        if FT.objects.filter(business_date__isnull=True).exists():
+            months.add(NULL_MONTH)
+    else:
+        months = {_month_key(d) for d in dates}
+    written = sum(_write_partition(key) for key in sorted(months))
+
+    os.makedirs(_root(), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=_root(), prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"ft_version": data_versions(("ft",))[0]}, f)
+    os.replace(tmp, os.path.join(_root(), MANIFEST))
+    return written
+
+
+# ---------------------------------------------------------------- queries
+
+def _conn():
+    con = getattr(_local, "con", None)
+    if con is None:
+        con = _local.con = duckdb.connect()
+    return con
+
+def _files(d1: Optional[date], d2: Optional[date], with_null: bool) -> List[str]:
+    """Partition files overlapping [d1, d2]; the partition layout prunes months before any scan."""
+    lo = _month_key(d1) if d1 else None
+    hi = _month_key(d2) if d2 else None
+    out = []
+    for key in _existing_months():
+        if key == NULL_MONTH:
+            if with_null:
+                out.append(_partition_file(key))
+        elif (lo is None or key >= lo) and (hi is None or key <= hi):
+            out.append(_partition_file(key))
+    return out
+
+def _query(select: str, resort, d1, d2, group_by: str = "", with_null: bool = False):
+    files = _files(d1, d2, with_null)
+    if not files:
+        return []
+    where, params = [], [files]
+    if isinstance(resort, (list, tuple)):
+        # several resorts (empty = all of them): the caller groups by resort
+        where.append("resort IS NOT NULL")
+        if resort:
+            where.append(f"resort IN ({', '.join('?' * len(resort))})")
+            params.extend(resort)
+    elif resort:
+        where.append("resort = ?")
+        params.append(resort)
+    if d1:
+        where.append("business_date >= ?")
+        params.append(d1)
+    if d2:
+        where.append("business_date <= ?")
+        params.append(d2)
+    sql = f"SELECT {select} FROM read_parquet(?)"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if group_by:
+        sql += f" GROUP BY {group_by} ORDER BY {group_by}"
+    return _conn().execute(sql, params).fetchall()
+
+TOTAL_KEYS = ("rows", "revenue", "gross", "net", "non_revenue")
+
+def _num(v) -> float:
+    return float(v) if v is not None else 0.0
+
+def revenue_by_date(resort: str | None, d1: date, d2: date) -> Dict[date, float]:
+    """Daily revenue (revenue_amt, else net_amount), as revenue_series computes from the rollup."""
+    rows = _query("business_date, SUM(revenue_amt), SUM(net_amount)", resort, d1, d2, group_by="business_date")
+    return {dt: _num(rev if rev is not None else net) for dt, rev, net in rows if dt is not None}
+
+def summary(resort: str | None, d1: date | None, d2: date | None) -> Dict[str, float]:
+    rows = _query(
+        "COUNT(*), SUM(revenue_amt), SUM(gross_amount), SUM(net_amount), SUM(non_revenue_amount)",
+        resort, d1, d2, with_null=not (d1 or d2),
+    )
+    vals = rows[0] if rows else (0, None, None, None, None)
+    return dict(zip(TOTAL_KEYS, map(_num, vals)))
+
+def summary_by_resort(resorts: List[str], d1: date | None, d2: date | None) -> Dict[str, Dict[str, float]]:
+    """summary() per resort in one pass; `resorts` empty = every resort."""
+    rows = _query(
+        "resort, COUNT(*), SUM(revenue_amt), SUM(gross_amount), SUM(net_amount), SUM(non_revenue_amount)",
+        list(resorts), d1, d2, group_by="resort", with_null=not (d1 or d2),
+    )
+    return {r[0]: dict(zip(TOTAL_KEYS, map(_num, r[1:]))) for r in rows}
+
+def timeseries(resort: str | None, d1: date | None, d2: date | None) -> List[dict]:
+    rows = _query("business_date, SUM(revenue_amt), SUM(gross_amount), SUM(net_amount)", resort, d1, d2,
+                  group_by="business_date")
+    return [
+        {"date": dt.isoformat(), "revenue": _num(rev), "gross": _num(gross), "net": _num(net)}
+        for dt, rev, gross, net in rows if dt is not None
+    ]
+
+def timeseries_by_resort(resorts: List[str], d1: date | None, d2: date | None) -> Dict[str, List[dict]]:
+    """timeseries() per resort in one pass; `resorts` empty = every resort."""
+    rows = _query("resort, business_date, SUM(revenue_amt), SUM(gross_amount), SUM(net_amount)", list(resorts), d1, d2,
+                  group_by="resort, business_date")
+    out: Dict[str, List[dict]] = {}
+    for resort, dt, rev, gross, net in rows:
+        if dt is not None:
+            out.setdefault(resort, []).append(
+                {"date": dt.isoformat(), "revenue": _num(rev), "gross": _num(gross), "net": _num(net)})
+    return out
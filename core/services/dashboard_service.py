@@ -0,0 +1,94 @@
+from __future__ import annotations
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict
+
+from django.db.models import Count, Q, Sum
+
+from core.helpers import fill_missing_dates, period_key, period_rows
+from core.models import Booking
+from core.services.rollup_service import rollup_qs, booking_rollup_qs
+from core.services.forecast_service import training_window, revenue_forecast
+
+def _daily_ft(resort:str|None, d1:date|None, d2:date|None):
+    """One ft rollup scan: per business_date revenue, net and per-row revenue-or-net sums."""
+    return (
+        rollup_qs(resort, d1, d2)
+        .filter(business_date__isnull=False)
+        .values("business_date")
+        .annotate(rev=Sum("revenue"), net=Sum("net"), ron=Sum("revenue_or_net"))
+        .order_by()
+        .values_list("business_date", "rev", "net", "ron")
+    )
+
+def revenue_booking_dashboard(resort:str|None, d1:date|None, d2:date|None, grp:str, months:int=12, horizon:int=180,
+                              engine:str="", latency_budget_ms:int|None=None) -> Dict:
+    """
+    The payloads of /api/trends/revenue, /api/trends/booking_rate and
+    /api/forecast/revenue for one page load, from shared reads:
+      - one ft rollup scan spanning the trend range and the forecast training
+        window feeds both the revenue trend and the forecast history,
+      - one booking rollup scan feeds booking counts and the seasonality,
+      - one Booking scan is left for distinct customers per period.
+    Raises ValueError for an unknown forecast engine.
+    """
+    t1, t2 = training_window(months)
+    lo = min(d1, t1) if d1 else None
+    hi = max(d2, t2) if d2 else None
+
+    revenue = defaultdict(Decimal)   # summed exactly, like the per-period SUM in trends_revenue
+    train = {}
+    for dt, rev, net, ron in _daily_ft(resort, lo, hi):
+        if (d1 is None or dt >= d1) and (d2 is None or dt <= d2):
+            revenue[period_key(dt, grp)] += ron or 0
+        if t1 <= dt <= t2:
+            value = rev if rev is not None else net
+            train[dt] = float(value or 0.0)
+
+    bookings = defaultdict(int)
+    weekday_counts = [0]*7
+    month_counts = [0]*12
+    for dt, n in booking_rollup_qs(d1, d2).values_list("checkin_date", "total"):
+        bookings[period_key(dt, grp)] += n
+        weekday_counts[dt.weekday()] += n
+        month_counts[dt.month - 1] += n
+
+    bk = Booking.objects.all()
+    if d1:
+        bk = bk.filter(checkin_date__gte=d1)
+    if d2:
+        bk = bk.filter(checkin_date__lte=d2)
+    customers = {
+        r["period"]: r["customers"]
+        for r in period_rows(bk, "checkin_date", grp, customers=Count("customer_id", distinct=True, filter=~Q(customer_id="")))
+    }
+
+    series = []
+    for k in sorted(set(revenue) | set(bookings)):
+        rev = float(revenue.get(k, 0))
+        bks = bookings.get(k, 0)
+        uniq = customers.get(k, 0)
+        series.append({
+            "period": k,
+            "revenue": round(rev, 2),
+            "bookings": bks,
+            "avg_rev_per_booking": round((rev / bks) if bks > 0 else 0.0, 2),
+            "avg_rev_per_customer": round((rev / uniq) if uniq > 0 else 0.0, 2),
+        })
+
+    # same seasonality figures as /api/trends/booking_rate
+    weekday_avg = [round(c / max(c, 1), 4) for c in weekday_counts]
+    month_avg = [round(c / max(c, 1), 4) for c in month_counts]
+
+    forecast = revenue_forecast(resort, t1, t2, horizon=horizon, engine=engine, latency_budget_ms=latency_budget_ms,
+                                series=fill_missing_dates(train, t1, t2))
+    return {
+        "revenue": {"series": series},
+        "booking_rate": {
+            "series": [{"period": k, "bookings": bookings[k]} for k in sorted(bookings)],
+            "weekday_avg": weekday_avg,
+            "month_avg": month_avg,
+        },
+        "forecast": forecast,
+    }
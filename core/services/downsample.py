@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import List
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+METHODS = ("lttb", "minmax")
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy required for max_points. pip install numpy")
+
+def lttb_indices(y, n_out:int):
+    """
+    Largest-Triangle-Three-Buckets over evenly spaced points: indices of the
+    `n_out` points (first and last always kept) that preserve the shape best.
+    Buckets are walked in order because each pick depends on the previous
+    one; the triangle areas inside a bucket are computed in one NumPy step.
+    """
+    _require_numpy()
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=int)
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)   # n_out - 2 buckets between the end points
+    # average point of every bucket, used as the third triangle vertex for the bucket before it
+    sums = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_y = np.append(sums / counts, y[-1])
+    avg_x = np.append((edges[:-1] + edges[1:] - 1) / 2.0, x[-1])
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def minmax_indices(y, n_out:int):
+    """
+    Keep the minimum and maximum of every bucket (plus the end points), so
+    every spike survives. Fully vectorized: buckets are padded into a matrix
+    and reduced along one axis. Returns at most `n_out` indices; below 4
+    there is no room for a min/max pair and LTTB picks the points instead.
+    """
+    _require_numpy()
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        return lttb_indices(y, n_out)
+    n_buckets = (n_out - 2) // 2   # first + last + 2 per bucket <= n_out
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(int)
+    width = int(np.diff(edges).max())
+    idx = edges[:-1, None] + np.arange(width)[None, :]
+    valid = idx < edges[1:, None]
+    idx = np.where(valid, idx, edges[:-1, None])      # padding repeats the bucket's first point
+    vals = y[idx]
+    pick = np.concatenate([
+        idx[np.arange(n_buckets), vals.argmin(axis=1)],
+        idx[np.arange(n_buckets), vals.argmax(axis=1)],
+        [0, n - 1],
+    ])
+    return np.unique(pick)
+
+def downsample_rows(rows:List[dict], max_points:int, key:str, method:str="lttb") -> List[dict]:
+    """Subset of `rows` (order kept, rows untouched) chosen on the `key` column."""
+    if max_points is None or len(rows) <= max_points:
+        return rows
+    if method not in METHODS:
+        raise ValueError(f"downsample must be one of {', '.join(METHODS)}")
+    pick = lttb_indices if method == "lttb" else minmax_indices
+    return [rows[i] for i in pick([r.get(key) or 0.0 for r in rows], max_points)]
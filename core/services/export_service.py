@@ -0,0 +1,210 @@
+from __future__ import annotations
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import django
+from django.conf import settings
+
+from core.cache import data_versions
+from core.disk_store import DiskLRUStore
+from core.helpers import stream_excel, stream_csv, write_parquet, fill_missing_dates
+from core.services.rollup_service import year_versions, rollup_qs, booking_days
+from core.services.revenue_service import revenue_series, revenue_series_by_resort, bookings_series, iter_model_ready_rows
+from core.services.cancellation_service import canc_noshow_series, iter_canc_noshow_series
+from core.services.leadtime_service import leadtime_distribution, iter_leadtime_distribution
+
+YEAR_ORDERS = {
+    "RevenueDaily": ["date","revenue","bookings","avg_rev_per_booking"],
+    "Cancellations": ["date","denominator","cancelled","no_show","cancel_rate","no_show_rate"],
+    "LeadTime": ["date","counts","share"],
+}
+FORMATS = ("xlsx", "csv", "parquet")
+
+_workbook_store = DiskLRUStore(
+    settings.EXPORT_CACHE_DIR,
+    max_bytes=getattr(settings, "EXPORT_CACHE_MAX_BYTES", None),
+    suffix=".xlsx",
+)
+
+def year_sheets(resort:str|None, year:int) -> Dict[str, Iterable[dict]]:
+    """Generators for the year workbook's sheets; each is consumed row by row."""
+    d1, d2 = date(year, 1, 1), date(year, 12, 31)
+    rev = revenue_series(resort, d1, d2)
+    days = booking_days(d1, d2)   # one booking rollup read shared by the three booking metrics
+    bks = bookings_series(d1, d2, days)
+    return {
+        "RevenueDaily": iter_model_ready_rows(rev, bks),
+        "Cancellations": iter_canc_noshow_series(d1, d2, basis="all", days=days),
+        "LeadTime": iter_leadtime_distribution(d1, d2, days=days),
+    }
+
+def year_workbook_key(resort:str|None, year:int) -> Tuple:
+    versions = data_versions(year_versions("ft", [year]) + year_versions("booking", [year]))
+    return ("year_excel", resort or "", year, versions)
+
+def year_workbook(resort:str|None, year:int) -> Tuple[str, bool]:
+    """
+    Path of the year workbook in the export cache, built on a miss, and
+    whether it was a cache hit. Keys carry that year's ft/booking data
+    versions, so a load touching the year makes old files unreachable and
+    they age out of the size-capped store.
+    """
+    key = year_workbook_key(resort, year)
+    path = _workbook_store.lookup(key)
+    if path is not None:
+        return path, True
+    tmp = _workbook_store.temp_path(".xlsx")
+    try:
+        stream_excel(year_sheets(resort, year), YEAR_ORDERS, path=tmp)
+    except BaseException:
+        _workbook_store.discard(tmp)
+        raise
+    return _workbook_store.adopt(key, tmp), False
+
+def parse_years(value:str) -> List[int]:
+    """"2021-2025" and/or "2019,2023" -> sorted list of years."""
+    years = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        lo, hi = int(lo), int(hi or lo)
+        if hi < lo or hi - lo > 50:
+            raise ValueError(f"bad year range: {part}")
+        years.update(range(lo, hi + 1))
+    if not years:
+        raise ValueError("no years given")
+    return sorted(years)
+
+def all_resorts() -> List[str]:
+    return list(rollup_qs().filter(resort__isnull=False).values_list("resort", flat=True).distinct().order_by("resort"))
+
+def _by_year(rows:Iterable[dict], years:List[int]) -> Dict[int, List[dict]]:
+    out = {y: [] for y in years}
+    for r in rows:
+        y = int(r["date"][:4])
+        if y in out:
+            out[y].append(r)
+    return out
+
+def batch_sheets(resorts:List[str], years:List[int]) -> Iterator[Tuple[str, int, Dict[str, List[dict]]]]:
+    """
+    (resort, year, sheets) for every pair, with the same rows as year_sheets().
+    Each rollup table is read once for the whole span: revenue grouped by
+    resort and day, one booking_days() read for bookings / cancellations /
+    lead time (they are not per resort), then split in memory.
+    """
+    d1, d2 = date(years[0], 1, 1), date(years[-1], 12, 31)
+    by_resort = revenue_series_by_resort(d1, d2, resorts)
+    days = booking_days(d1, d2)
+    bks = bookings_series(d1, d2, days)
+    canc = _by_year(canc_noshow_series(d1, d2, basis="all", days=days), years)
+    lead = _by_year(leadtime_distribution(d1, d2, days=days), years)
+    for resort in resorts:
+        rev = by_resort.get(resort, {})
+        for y in years:
+            rev_y = fill_missing_dates({dt: v for dt, v in rev.items() if dt.year == y}, date(y, 1, 1), date(y, 12, 31))
+            yield resort, y, {
+                "RevenueDaily": list(iter_model_ready_rows(rev_y, bks)),
+                "Cancellations": canc[y],
+                "LeadTime": lead[y],
+            }
+
+def _safe_name(s:str) -> str:
+    return re.sub(r"[^\w.-]+", "_", s) or "_"
+
+def _render_part(resort:str, year:int, sheets:Dict[str, List[dict]], fmt:str, out_dir:str) -> List[Tuple[str, str]]:
+    """Pool worker: write one (resort, year) in `fmt`; returns [(name inside the zip, file path)]."""
+    name = _safe_name(resort)
+    if fmt == "xlsx":
+        path = os.path.join(out_dir, f"{name}_{year}.xlsx")
+        stream_excel(sheets, YEAR_ORDERS, path=path)
+        return [(f"{name}/Trends_{name}_{year}.xlsx", path)]
+    writer = stream_csv if fmt == "csv" else write_parquet
+    files = []
+    for sheet, rows in sheets.items():
+        path = os.path.join(out_dir, f"{name}_{year}_{sheet}.{fmt}")
+        writer(rows, path, YEAR_ORDERS.get(sheet))
+        files.append((f"{name}/{year}/{sheet}.{fmt}", path))
+    return files
+
+def batch_export(resorts:List[str]|None, years:List[int], fmt:str="xlsx", workers:int=1, path:str|None=None,
+                 progress:Callable[[int, int], None]|None=None) -> dict:
+    """
+    Write the year sheets for every (resort, year) into one zip. Sheets come
+    from batch_sheets(); files are rendered by `workers` processes (inline
+    when 1) and added to the zip as they finish. `progress(done, total)` is
+    called after each pair. Defaults to all resorts and a new zip in
+    EXPORT_BATCH_DIR.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    started = time.perf_counter()
+    years = sorted(set(years))
+    resorts = sorted(set(resorts)) if resorts else all_resorts()
+    total = len(resorts) * len(years)
+
+    out_dir = str(settings.EXPORT_BATCH_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    if path is None:
+        fd, path = tempfile.mkstemp(dir=out_dir, prefix="batch-", suffix=".zip")
+        os.close(fd)
+
+    done = files = 0
+    with tempfile.TemporaryDirectory(dir=out_dir, prefix=".work-") as work, \
+            zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        def add(rendered):
+            nonlocal done, files
+            for arcname, p in rendered:
+                # xlsx and parquet are compressed already
+                zf.write(p, arcname, compress_type=zipfile.ZIP_DEFLATED if p.endswith(".csv") else zipfile.ZIP_STORED)
+                os.remove(p)
+                files += 1
+            done += 1
+            if progress:
+                progress(done, total)
+
+        parts = batch_sheets(resorts, years) if total else iter(())
+        if workers <= 1:
+            for resort, year, sheets in parts:
+                add(_render_part(resort, year, sheets, fmt, work))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+                futures = [pool.submit(_render_part, resort, year, sheets, fmt, work) for resort, year, sheets in parts]
+                for fut in as_completed(futures):
+                    add(fut.result())
+
+    return {
+        "file": os.path.basename(path),
+        "format": fmt,
+        "resorts": resorts,
+        "years": years,
+        "parts": total,
+        "files": files,
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def batch_export_job(params:dict) -> dict:
+    """core.jobs handler for kind="batch_export": params {resorts, years, format, workers}."""
+    from core.jobs import report_progress
+    return batch_export(
+        params.get("resorts") or None,
+        params["years"],
+        fmt=params.get("format") or "xlsx",
+        workers=int(params.get("workers") or 1),
+        progress=lambda done, total: report_progress(done=done, total=total),
+    )
+
+def batch_export_path(result:dict) -> str | None:
+    """Zip of a finished batch export job, if it is still on disk."""
+    name = os.path.basename((result or {}).get("file") or "")
+    path = os.path.join(str(settings.EXPORT_BATCH_DIR), name)
+    return path if name and os.path.isfile(path) else None
@@ -0,0 +1,105 @@
+from __future__ import annotations
+from typing import Dict, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+SEASON = 7   # weekly seasonality on daily data
+
+# Holt-Winters smoothing grid (alpha, beta, gamma); every series picks its own best triple in-sample.
+HW_GRID = tuple(
+    (a, b, g)
+    for a in (0.1, 0.3, 0.6)
+    for b in (0.0, 0.05)
+    for g in (0.1, 0.3)
+)
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy required. pip install numpy")
+
+def _as_matrix(Y):
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[None, :]
+    return np.nan_to_num(Y)
+
+def seasonal_naive(Y, h:int, m:int=SEASON):
+    """Repeat each series' last season. Y: (k, n) -> (k, h)."""
+    _require_numpy()
+    Y = _as_matrix(Y)
+    if Y.shape[1] < m:
+        return drift(Y, h)
+    last = Y[:, -m:]
+    reps = -(-h // m)
+    return np.tile(last, reps)[:, :h]
+
+def drift(Y, h:int):
+    """Last value plus the average historical slope. Y: (k, n) -> (k, h)."""
+    _require_numpy()
+    Y = _as_matrix(Y)
+    n = Y.shape[1]
+    slope = (Y[:, -1] - Y[:, 0]) / max(n - 1, 1)
+    steps = np.arange(1, h + 1)
+    return Y[:, -1:] + slope[:, None] * steps[None, :]
+
+def _hw_run(Y, m, alpha, beta, gamma):
+    """Additive Holt-Winters over (k, n) with per-row parameters; returns final state and in-sample SSE."""
+    k, n = Y.shape
+    level = Y[:, :m].mean(axis=1)
+    trend = (Y[:, m:2 * m].mean(axis=1) - level) / m if n >= 2 * m else np.zeros(k)
+    season = Y[:, :m] - level[:, None]
+    sse = np.zeros(k)
+    for t in range(m, n):
+        s_idx = t % m
+        pred = level + trend + season[:, s_idx]
+        err = Y[:, t] - pred
+        sse += err * err
+        new_level = alpha * (Y[:, t] - season[:, s_idx]) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, s_idx] = gamma * (Y[:, t] - new_level) + (1 - gamma) * season[:, s_idx]
+        level = new_level
+    return level, trend, season, sse
+
+def holt_winters(Y, h:int, m:int=SEASON, grid:Sequence[Tuple[float, float, float]]=HW_GRID):
+    """
+    Additive Holt-Winters with weekly seasonality for many series at once.
+    Every (series, grid point) pair is run in one vectorized pass; each series
+    keeps the smoothing triple with the lowest in-sample SSE. Y: (k, n) -> (k, h).
+    """
+    _require_numpy()
+    Y = _as_matrix(Y)
+    k, n = Y.shape
+    if n < 2 * m:
+        return seasonal_naive(Y, h, m)
+    g = len(grid)
+    params = np.asarray(grid, dtype=float)
+    stacked = np.repeat(Y, g, axis=0)                      # (k*g, n)
+    alpha, beta, gamma = (np.tile(params[:, i], k) for i in range(3))
+    level, trend, season, sse = _hw_run(stacked, m, alpha, beta, gamma)
+
+    best = sse.reshape(k, g).argmin(axis=1) + np.arange(k) * g
+    level, trend, season = level[best], trend[best], season[best]
+    steps = np.arange(1, h + 1)
+    s_idx = (n + steps - 1) % m
+    return level[:, None] + trend[:, None] * steps[None, :] + season[:, s_idx]
+
+MODELS = {
+    "holt_winters": holt_winters,
+    "seasonal_naive": seasonal_naive,
+    "drift": drift,
+}
+
+def forecast_matrix(Y, h:int, model:str):
+    return MODELS[model](Y, h)
+
+def holdout_errors(Y, h:int) -> Dict[str, np.ndarray]:
+    """Per-series mean absolute error of each fast model on the last `h` points: {model: (k,)}."""
+    _require_numpy()
+    Y = _as_matrix(Y)
+    if Y.shape[1] <= h + 2 * SEASON:
+        return {}
+    train, test = Y[:, :-h], Y[:, -h:]
+    return {name: np.abs(fn(train, h) - test).mean(axis=1) for name, fn in MODELS.items()}
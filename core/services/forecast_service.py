@@ -1,27 +1,93 @@
 from __future__ import annotations
+import time
+from collections import defaultdict
 from datetime import date, timedelta
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Tuple
 
+from django.conf import settings
+
+from django.db import transaction
+from django.db.models import Q
+
+from core.cache import data_versions
+from core.models import RevenueForecast
+from core.disk_store import DiskLRUStore
 from core.helpers import ensure_range
 from core.services.revenue_service import revenue_series
+from core.services import fast_forecast
+from core.services.backtest_service import cached_best_model
+
+ARIMA_ORDER = (1, 1, 1)
+ENGINES = ("auto", "arima") + tuple(fast_forecast.MODELS)
+
+_fit_store = DiskLRUStore(
+    settings.FORECAST_CACHE_DIR,
+    max_entries=getattr(settings, "FORECAST_CACHE_MAX_ENTRIES", 256),
+)
+
+@lru_cache(maxsize=1)
+def _arima_deps():
+    try:
+        import pandas as pd
+        import numpy as np
+        from statsmodels.tsa.arima.model import ARIMA
+    except Exception as e:
+        raise RuntimeError("statsmodels/pandas/numpy required. pip install statsmodels pandas numpy") from e
+    return pd, np, ARIMA
+
+def _arima_key(resort, d1, d2, order, version):
+    return ("arima", resort or "", d1.isoformat(), d2.isoformat(), tuple(order), version)
+
+def _fit_ms_key(resort, order, days):
+    return ("arima-fit-ms", resort or "", tuple(order), days)
 
-def arima_forecast_series(resort:str|None, d1:date|None, d2:date|None, horizon:int=56) -> Dict[str, List[dict]]:
+def fitted_arima(resort:str|None, d1:date, d2:date, s, order:Tuple[int,int,int]=ARIMA_ORDER, version:int|None=None):
     """
+    Fitted ARIMA results for `s`, cached on disk by (resort, window, order, ft data version).
+    On a miss the last parameters fitted for the same resort/order/window length
+    seed the optimizer, so a window that only gained new days refits quickly;
+    the fit's duration is kept next to them for arima_fit_cost_ms().
+    Pass `version` to skip the DataVersion lookup (e.g. in pool workers).
+    """
+    pd, np, ARIMA = _arima_deps()
+    if version is None:
+        version = data_versions(("ft",))[0]
+    key = _arima_key(resort, d1, d2, order, version)
+    fit = _fit_store.load(key)
+    if fit is not None:
+        return fit
+
+    warm_key = ("arima-params", resort or "", tuple(order), (d2 - d1).days)
+    warm = _fit_store.load(warm_key)
+    model = ARIMA(s, order=order)
+    kwargs = {"method_kwargs": {"warn_convergence": False}}
+    if warm is not None and len(warm) == len(model.param_names):
+        kwargs["start_params"] = warm
+    t0 = time.perf_counter()
+    fit = model.fit(**kwargs)
+    fit_ms = (time.perf_counter() - t0) * 1000
+
+    _fit_store.dump(key, fit)
+    _fit_store.dump(warm_key, np.asarray(fit.params))
+    _fit_store.dump(_fit_ms_key(resort, order, (d2 - d1).days), fit_ms)
+    return fit
+
+def arima_forecast_series(resort:str|None, d1:date|None, d2:date|None, horizon:int=56,
+                          series:Dict[date, float]|None=None) -> Dict[str, List[dict]]:
+    """
+    `series` skips the revenue_series() read when the caller already has it.
     Returns:
       {
         "history": [{"date": "...", "value": ...}, ...],
         "forecast": [{"date": "...", "value": ...}, ...]
       }
     """
-    try:
-        import pandas as pd
-        import numpy as np
-        from statsmodels.tsa.arima.model import ARIMA
-    except Exception as e:
-        raise RuntimeError("statsmodels/pandas/numpy required. pip install statsmodels pandas numpy") from e
+    pd, np, ARIMA = _arima_deps()
 
     d1, d2 = ensure_range(d1, d2, default_days=365)
-    series = revenue_series(resort, d1, d2)  
+    if series is None:
+        series = revenue_series(resort, d1, d2)
     if not series:
         return {"history": [], "forecast": []}
 
@@ -29,8 +95,7 @@ def arima_forecast_series(resort:str|None, d1:date|None, d2:date|None, horizon:i
     y = [series[dt] for dt in idx]
     s = pd.Series(y, index=pd.to_datetime(idx))
 
-    model = ARIMA(s, order=(1,1,1))
-    fit = model.fit(method_kwargs={"warn_convergence": False})
+    fit = fitted_arima(resort, d1, d2, s)
 
     future_idx = [idx[-1] + timedelta(days=i) for i in range(1, horizon+1)]
     fc = fit.forecast(steps=horizon)
@@ -39,3 +104,166 @@ def arima_forecast_series(resort:str|None, d1:date|None, d2:date|None, horizon:i
     forecast = [{"date": d.isoformat(), "value": float(v)} for d, v in zip(future_idx, fc)]
 
     return {"history": history, "forecast": forecast}
+
+def training_window(months:int) -> Tuple[date, date]:
+    """Last N months (clamped to 28..370 days) ending today."""
+    days = max(28, min(370, months*30))
+    return ensure_range(None, None, default_days=days)
+
+def forecast_job(params:dict) -> Dict[str, List[dict]]:
+    """core.jobs handler for kind="forecast": params {resort, months, horizon}."""
+    d1, d2 = training_window(int(params.get("months") or 12))
+    return arima_forecast_series(params.get("resort") or None, d1, d2, horizon=int(params.get("horizon") or 56))
+
+def forecast_values(resort:str, d1:date, d2:date, series:Dict[date, float], horizon:int, version:int) -> List[float]:
+    """Pool worker entry point: fit (or reuse) the resort's ARIMA and return `horizon` daily values."""
+    pd, np, ARIMA = _arima_deps()
+    idx = sorted(series.keys())
+    s = pd.Series([series[dt] for dt in idx], index=pd.to_datetime(idx))
+    fit = fitted_arima(resort, d1, d2, s, version=version)
+    return [float(v) for v in fit.forecast(steps=horizon)]
+
+@transaction.atomic
+def save_precomputed(resort:str, d1:date, d2:date, version:int, values:List[float]) -> int:
+    """Store one fit, replacing the same window and pruning windows that ended before `d2`."""
+    RevenueForecast.objects.filter(resort=resort).filter(Q(train_to__lt=d2) | Q(train_from=d1, train_to=d2)).delete()
+    rows = [
+        RevenueForecast(resort=resort, train_from=d1, train_to=d2, data_version=version,
+                        model="arima%s" % (ARIMA_ORDER,), date=d2 + timedelta(days=i), value=v)
+        for i, v in enumerate(values, start=1)
+    ]
+    RevenueForecast.objects.bulk_create(rows)
+    return len(rows)
+
+def precomputed_forecast(resort:str|None, d1:date, d2:date, horizon:int,
+                         series:Dict[date, float]|None=None) -> Dict[str, List[dict]] | None:
+    """Stored forecast for exactly this window and the current ft data, or None."""
+    if not resort:
+        return None
+    version = data_versions(("ft",))[0]
+    rows = list(
+        RevenueForecast.objects.filter(resort=resort, train_from=d1, train_to=d2, data_version=version)
+        .order_by("date").values_list("date", "value")[:horizon]
+    )
+    if len(rows) < horizon:
+        return None
+    if series is None:
+        series = revenue_series(resort, d1, d2)
+    history = [{"date": d.isoformat(), "value": float(series[d])} for d in sorted(series.keys())]
+    forecast = [{"date": d.isoformat(), "value": float(v)} for d, v in rows]
+    return {"history": history, "forecast": forecast}
+
+def arima_is_cached(resort:str|None, d1:date, d2:date) -> bool:
+    return _fit_store.lookup(_arima_key(resort, d1, d2, ARIMA_ORDER, data_versions(("ft",))[0])) is not None
+
+def arima_fit_cost_ms(resort:str|None, d1:date, d2:date) -> float:
+    """
+    Expected ARIMA latency for this window: 0 when the fit is cached, else the
+    last measured fit for this resort and window length, else settings.ARIMA_COLD_FIT_MS.
+    """
+    if arima_is_cached(resort, d1, d2):
+        return 0.0
+    ms = _fit_store.load(_fit_ms_key(resort, ARIMA_ORDER, (d2 - d1).days))
+    return float(ms) if ms is not None else float(getattr(settings, "ARIMA_COLD_FIT_MS", 3000))
+
+def _pick_engine(resort:str|None, d1:date, d2:date, engine:str, latency_budget_ms:int|None) -> str:
+    """
+    engine="auto" resolved for one resort: a cached backtest winner among the
+    affordable engines, else ARIMA if affordable, else "auto" (lowest hold-out error
+    among the NumPy models). Named engines pass through.
+    """
+    if engine != "auto":
+        return engine
+    allowed = list(fast_forecast.MODELS)
+    arima_ok = latency_budget_ms is None or arima_fit_cost_ms(resort, d1, d2) <= latency_budget_ms
+    if arima_ok:
+        allowed.insert(0, "arima")
+    best = cached_best_model(resort, d1, d2, allowed)
+    if best:
+        return best
+    return "arima" if arima_ok else "auto"
+
+def _fast_payload(idx:List[date], series:Dict[date, float], fc, model:str) -> Dict[str, List[dict]]:
+    future_idx = [idx[-1] + timedelta(days=i) for i in range(1, len(fc)+1)]
+    return {
+        "history": [{"date": d.isoformat(), "value": float(series[d])} for d in idx],
+        "forecast": [{"date": d.isoformat(), "value": float(v)} for d, v in zip(future_idx, fc)],
+        "model": model,
+    }
+
+def forecast_many(series_by_resort:Dict[str|None, Dict[date, float]], d1:date, d2:date, horizon:int=56,
+                  engine:str="auto", latency_budget_ms:int|None=None) -> Dict[str|None, Dict[str, List[dict]]]:
+    """
+    forecast_with_engine() for many resorts. Each resort's engine is picked on its
+    own; resorts landing on a NumPy model are stacked into one matrix per
+    (model, dates) so each model runs once for all of them.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+
+    out = {}
+    fast = defaultdict(list)
+    for r, series in series_by_resort.items():
+        picked = _pick_engine(r, d1, d2, engine, latency_budget_ms)
+        if picked == "arima":
+            out[r] = arima_forecast_series(r, d1, d2, horizon=horizon, series=series)
+            out[r]["model"] = "arima"
+        elif not series:
+            out[r] = {"history": [], "forecast": [], "model": picked}
+        else:
+            fast[(picked, tuple(sorted(series.keys())))].append(r)
+
+    for (picked, idx), resorts in fast.items():
+        Y = [[series_by_resort[r][dt] for dt in idx] for r in resorts]
+        models = [picked] * len(resorts)
+        if picked == "auto":
+            errors = fast_forecast.holdout_errors(Y, min(horizon, 28))
+            names = list(errors)
+            models = [min(names, key=lambda n: errors[n][i]) if names else "seasonal_naive"
+                      for i in range(len(resorts))]
+        for model in dict.fromkeys(models):
+            rows = [i for i, m in enumerate(models) if m == model]
+            fc = fast_forecast.forecast_matrix([Y[i] for i in rows], horizon, model)
+            for i, f in zip(rows, fc):
+                out[resorts[i]] = _fast_payload(list(idx), series_by_resort[resorts[i]], f, model)
+    return {r: out[r] for r in series_by_resort}
+
+def forecast_with_engine(resort:str|None, d1:date, d2:date, horizon:int=56,
+                         engine:str="auto", latency_budget_ms:int|None=None,
+                         series:Dict[date, float]|None=None) -> Dict[str, List[dict]]:
+    """
+    Forecast with a named engine, or with engine="auto" pick the best model
+    affordable within `latency_budget_ms` (ARIMA only when arima_fit_cost_ms()
+    fits). The ranking comes from a cached backtest of this window when one
+    exists, else ARIMA if affordable, else the NumPy model with the lowest
+    hold-out error. The payload adds "model".
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+    if series is None:
+        series = revenue_series(resort, d1, d2)
+    return forecast_many({resort: series}, d1, d2, horizon=horizon, engine=engine,
+                         latency_budget_ms=latency_budget_ms)[resort]
+
+def revenue_forecast(resort:str|None, d1:date, d2:date, horizon:int=56, engine:str="",
+                     latency_budget_ms:int|None=None, series:Dict[date, float]|None=None) -> Dict[str, List[dict]]:
+    """
+    What /api/forecast/revenue serves: a named engine or latency budget goes
+    through forecast_with_engine(); otherwise the stored forecast for this
+    window, else a live ARIMA fit. Raises ValueError for an unknown engine.
+    """
+    if (engine and engine != "arima") or latency_budget_ms is not None:
+        return forecast_with_engine(resort, d1, d2, horizon=horizon, engine=engine or "auto",
+                                    latency_budget_ms=latency_budget_ms, series=series)
+    res = precomputed_forecast(resort, d1, d2, horizon, series=series)
+    if res is None:
+        res = arima_forecast_series(resort, d1, d2, horizon=horizon, series=series)
+    return res
+
+def revenue_forecasts(series_by_resort:Dict[str, Dict[date, float]], d1:date, d2:date, horizon:int=56,
+                      engine:str="", latency_budget_ms:int|None=None) -> Dict[str, Dict[str, List[dict]]]:
+    """revenue_forecast() for many resorts; engine/budget requests go through forecast_many() in one pass."""
+    if (engine and engine != "arima") or latency_budget_ms is not None:
+        return forecast_many(series_by_resort, d1, d2, horizon=horizon, engine=engine or "auto",
+                             latency_budget_ms=latency_budget_ms)
+    return {r: revenue_forecast(r, d1, d2, horizon=horizon, series=s) for r, s in series_by_resort.items()}
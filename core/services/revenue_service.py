@@ -1,34 +1,138 @@
 from __future__ import annotations
 from datetime import date
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List
 
 from django.db.models import Sum
-from core.models_ft import FinancialTransaction as FT
-from core.models import Booking
 from core.helpers import ensure_range, fill_missing_dates, clamp_outliers_iqr
+from core.services.rollup_service import rollup_qs, booking_rollup_qs
+from core.services import columnar_service
+
+def use_columnar() -> bool:
+    """Answer ft reads from the Parquet snapshot (FT_ANALYTICS_BACKEND="duckdb") while it is current."""
+    return columnar_service.enabled() and columnar_service.snapshot_current()
 
 def revenue_series(resort:str|None, d1:date|None, d2:date|None) -> Dict[date, float]:
     d1, d2 = ensure_range(d1, d2, default_days=365)
-    qs = FT.objects.filter(business_date__gte=d1, business_date__lte=d2)
-    if resort:
-        qs = qs.filter(resort=resort)
+    if use_columnar():
+        return fill_missing_dates(columnar_service.revenue_by_date(resort, d1, d2), d1, d2)
+    qs = rollup_qs(resort, d1, d2)
     bucket: Dict[date, float] = defaultdict(float)
     for r in qs.values("business_date").annotate(
-        revenue=Sum("revenue_amt"),
-        net=Sum("net_amount"),
-    ):
+        revenue=Sum("revenue"),
+        net=Sum("net"),
+    ).order_by():
         dt = r["business_date"]
         rev = r["revenue"] if r["revenue"] is not None else r["net"]
         bucket[dt] += float(rev or 0.0)
     return fill_missing_dates(bucket, d1, d2)
 
-def bookings_series(d1:date|None, d2:date|None) -> Dict[date, int]:
+def ft_totals(resort:str|None, d1:date|None, d2:date|None) -> Dict[str, float]:
+    """Row count and amount totals; open ranges include rows without a business_date."""
+    if use_columnar():
+        return columnar_service.summary(resort, d1, d2)
+    agg = rollup_qs(resort, d1, d2).aggregate(
+        rows=Sum("rows"),
+        revenue=Sum("revenue"),
+        gross=Sum("gross"),
+        net=Sum("net"),
+        non_revenue=Sum("non_revenue"),
+    )
+    return {k: (float(v) if v is not None else 0.0) for k, v in agg.items()}
+
+def ft_revenue_timeseries(resort:str|None, d1:date|None, d2:date|None) -> List[dict]:
+    """Daily revenue / gross / net for dated rows, oldest first."""
+    return list(iter_ft_revenue_timeseries(resort, d1, d2))
+
+def iter_ft_revenue_timeseries(resort:str|None, d1:date|None, d2:date|None, chunk_size:int=2000) -> Iterator[dict]:
+    if use_columnar():
+        yield from columnar_service.timeseries(resort, d1, d2)
+        return
+    rows = (
+        rollup_qs(resort, d1, d2)
+        .filter(business_date__isnull=False)
+        .values("business_date")
+        .annotate(
+            revenue=Sum("revenue"),
+            gross=Sum("gross"),
+            net=Sum("net"),
+        )
+        .order_by("business_date")
+    )
+    for r in rows.iterator(chunk_size=chunk_size):
+        yield {
+            "date": r["business_date"].isoformat(),
+            "revenue": float(r["revenue"] or 0),
+            "gross": float(r["gross"] or 0),
+            "net": float(r["net"] or 0),
+        }
+
+def _resort_rollup_qs(resorts:List[str]|None, d1:date|None, d2:date|None):
+    qs = rollup_qs(None, d1, d2).filter(resort__isnull=False)
+    return qs.filter(resort__in=resorts) if resorts else qs
+
+def ft_totals_by_resort(resorts:List[str]|None, d1:date|None, d2:date|None) -> Dict[str, Dict[str, float]]:
+    """
+    ft_totals() for several resorts (None/[] = every resort) from one
+    GROUP BY resort; requested resorts without rows get zero totals.
+    """
+    if use_columnar():
+        found = columnar_service.summary_by_resort(resorts or [], d1, d2)
+    else:
+        found = {
+            r.pop("resort"): {k: (float(v) if v is not None else 0.0) for k, v in r.items()}
+            for r in _resort_rollup_qs(resorts, d1, d2).values("resort").annotate(
+                rows=Sum("rows"),
+                revenue=Sum("revenue"),
+                gross=Sum("gross"),
+                net=Sum("net"),
+                non_revenue=Sum("non_revenue"),
+            ).order_by()
+        }
+    empty = dict.fromkeys(("rows", "revenue", "gross", "net", "non_revenue"), 0.0)
+    return {r: found.get(r, dict(empty)) for r in sorted(set(resorts or ()) | set(found))}
+
+def ft_revenue_timeseries_by_resort(resorts:List[str]|None, d1:date|None, d2:date|None) -> Dict[str, List[dict]]:
+    """ft_revenue_timeseries() for several resorts from one GROUP BY resort, business_date."""
+    if use_columnar():
+        found = columnar_service.timeseries_by_resort(resorts or [], d1, d2)
+    else:
+        found = defaultdict(list)
+        rows = (
+            _resort_rollup_qs(resorts, d1, d2)
+            .filter(business_date__isnull=False)
+            .values("resort", "business_date")
+            .annotate(revenue=Sum("revenue"), gross=Sum("gross"), net=Sum("net"))
+            .order_by("resort", "business_date")
+        )
+        for r in rows:
+            found[r["resort"]].append({
+                "date": r["business_date"].isoformat(),
+                "revenue": float(r["revenue"] or 0),
+                "gross": float(r["gross"] or 0),
+                "net": float(r["net"] or 0),
+            })
+    return {r: found.get(r, []) for r in sorted(set(resorts or ()) | set(found))}
+
+def revenue_series_by_resort(d1:date|None, d2:date|None, resorts:List[str]|None=None) -> Dict[str, Dict[date, float]]:
+    """revenue_series() for many resorts from one GROUP BY resort, business_date."""
     d1, d2 = ensure_range(d1, d2, default_days=365)
-    qs = Booking.objects.filter(checkin_date__gte=d1, checkin_date__lte=d2)
-    bucket: Dict[date, int] = defaultdict(int)
-    for r in qs.values_list("checkin_date", flat=True):
-        bucket[r] += 1
+    qs = _resort_rollup_qs(resorts, d1, d2)
+    buckets: Dict[str, Dict[date, float]] = defaultdict(lambda: defaultdict(float))
+    for r in qs.values("resort", "business_date").annotate(
+        revenue=Sum("revenue"),
+        net=Sum("net"),
+    ).order_by():
+        rev = r["revenue"] if r["revenue"] is not None else r["net"]
+        buckets[r["resort"]][r["business_date"]] += float(rev or 0.0)
+    return {res: fill_missing_dates(b, d1, d2) for res, b in sorted(buckets.items())}
+
+def bookings_series(d1:date|None, d2:date|None, days:Dict[date, object]|None=None) -> Dict[date, int]:
+    d1, d2 = ensure_range(d1, d2, default_days=365)
+    if days is None:
+        bucket: Dict[date, int] = dict(booking_rollup_qs(d1, d2).values_list("checkin_date", "total"))
+    else:
+        bucket = {dt: r.total for dt, r in days.items()}
     return fill_missing_dates(bucket, d1, d2)
 
 def avg_revenue_per_booking(rev:Dict[date,float], bks:Dict[date,int]) -> Dict[date, float]:
@@ -40,14 +144,15 @@ def avg_revenue_per_booking(rev:Dict[date,float], bks:Dict[date,int]) -> Dict[da
     clamped = clamp_outliers_iqr(list(out.values()))
     return {k: clamped[i] for i, k in enumerate(out.keys())}
 
-def model_ready_rows(rev:Dict[date,float], bks:Dict[date,int]) -> List[dict]:
-    """Return rows ready for graph or feed to model."""
-    rows = []
+def iter_model_ready_rows(rev:Dict[date,float], bks:Dict[date,int]) -> Iterator[dict]:
     for dt in sorted(rev.keys()):
-        rows.append({
+        yield {
             "date": dt.isoformat(),
             "revenue": round(rev[dt], 2),
             "bookings": int(bks.get(dt, 0)),
             "avg_rev_per_booking": round(rev[dt]/max(bks.get(dt,0),1), 2)
-        })
-    return rows
+        }
+
+def model_ready_rows(rev:Dict[date,float], bks:Dict[date,int]) -> List[dict]:
+    """Return rows ready for graph or feed to model."""
+    return list(iter_model_ready_rows(rev, bks))
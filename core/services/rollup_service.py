@@ -0,0 +1,156 @@
+from __future__ import annotations
+from datetime import date
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from core.models import Booking, BookingDailyRollup
+from core.models_ft import FinancialTransaction as FT, FTDailyRollup
+from core.cache import bump_data_version
+from core.helpers import LEAD_BUCKETS
+from core.services.booking_scan import scan_bookings, StatusCounts, LeadTimeBuckets
+
+DATE_CHUNK = 500
+
+def year_versions(name: str, years: Iterable[int]) -> list:
+    """Per-year DataVersion names, e.g. "ft:2025", for caches scoped to one year."""
+    return [f"{name}:{y}" for y in sorted(set(years))]
+
+def _years(dates: Iterable[Optional[date]]) -> set:
+    return {d.year for d in dates if d is not None}
+
+def ft_rollup_years() -> set:
+    return {d.year for d in FTDailyRollup.objects.filter(business_date__isnull=False).dates("business_date", "year")}
+
+def booking_rollup_years() -> set:
+    return {d.year for d in BookingDailyRollup.objects.dates("checkin_date", "year")}
+
+def _aggregate(qs):
+    return qs.values("resort", "business_date").annotate(
+        n=Count("pkid"),
+        rev=Sum("revenue_amt"),
+        rev_or_net=Sum(Coalesce("revenue_amt", "net_amount")),
+        gross_sum=Sum("gross_amount"),
+        net_sum=Sum("net_amount"),
+        non_rev=Sum("non_revenue_amount"),
+    ).order_by()
+
+def _rollup_rows(qs):
+    return [
+        FTDailyRollup(
+            resort=r["resort"],
+            business_date=r["business_date"],
+            rows=r["n"],
+            revenue=r["rev"],
+            revenue_or_net=r["rev_or_net"],
+            gross=r["gross_sum"],
+            net=r["net_sum"],
+            non_revenue=r["non_rev"],
+        )
+        for r in _aggregate(qs)
+    ]
+
+@transaction.atomic
+def refresh_daily_rollup(dates: Iterable[Optional[date]]) -> int:
+    """Recompute ft_daily_rollup for the given business dates (None = rows without a date)."""
+    dates = set(dates)
+    touched = bool(dates)
+    written = 0
+    if None in dates:
+        dates.discard(None)
+        FTDailyRollup.objects.filter(business_date__isnull=True).delete()
+        objs = _rollup_rows(FT.objects.filter(business_date__isnull=True))
+        FTDailyRollup.objects.bulk_create(objs)
+        written += len(objs)
+
+    ordered = sorted(dates)
+    for i in range(0, len(ordered), DATE_CHUNK):
+        chunk = ordered[i:i + DATE_CHUNK]
+        FTDailyRollup.objects.filter(business_date__in=chunk).delete()
+        objs = _rollup_rows(FT.objects.filter(business_date__in=chunk))
+        FTDailyRollup.objects.bulk_create(objs, batch_size=DATE_CHUNK)
+        written += len(objs)
+    if touched:
+        bump_data_version("ft", *year_versions("ft", _years(ordered)))
+    return written
+
+@transaction.atomic
+def rebuild_daily_rollup() -> int:
+    """Drop and rebuild the whole rollup from financial_transaction."""
+    years = ft_rollup_years()
+    FTDailyRollup.objects.all().delete()
+    objs = _rollup_rows(FT.objects.all())
+    FTDailyRollup.objects.bulk_create(objs, batch_size=DATE_CHUNK)
+    years |= _years(o.business_date for o in objs)
+    bump_data_version("ft", *year_versions("ft", years))
+    return len(objs)
+
+def rollup_qs(resort: str | None = None, d1: date | None = None, d2: date | None = None):
+    qs = FTDailyRollup.objects.all()
+    if resort:
+        qs = qs.filter(resort=resort)
+    if d1:
+        qs = qs.filter(business_date__gte=d1)
+    if d2:
+        qs = qs.filter(business_date__lte=d2)
+    return qs
+
+
+BOOKING_ROLLUP_FIELDS = [f.name for f in BookingDailyRollup._meta.concrete_fields
+                         if not f.primary_key and f.name != "checkin_date"]
+
+def _booking_rollup_rows(qs):
+    res = scan_bookings(qs, (StatusCounts(), LeadTimeBuckets()))
+    lead = res["lead"]
+    return [
+        BookingDailyRollup(
+            checkin_date=dt, **counts,
+            **{f"lead_{b}": n for b, n in lead[dt].items()},
+        )
+        for dt, counts in res["status"].items()
+    ]
+
+@transaction.atomic
+def refresh_booking_rollup(dates: Iterable[date]) -> int:
+    """Recompute booking_daily_rollup for the given check-in dates (use after bulk writes)."""
+    ordered = sorted(d for d in set(dates) if d is not None)
+    written = 0
+    for i in range(0, len(ordered), DATE_CHUNK):
+        chunk = ordered[i:i + DATE_CHUNK]
+        objs = _booking_rollup_rows(Booking.objects.filter(checkin_date__in=chunk))
+        # upsert instead of delete + insert: two writers refreshing the same day
+        # (concurrent Booking saves) must not collide on the unique checkin_date
+        BookingDailyRollup.objects.bulk_create(objs, batch_size=DATE_CHUNK, update_conflicts=True,
+                                               unique_fields=["checkin_date"], update_fields=BOOKING_ROLLUP_FIELDS)
+        BookingDailyRollup.objects.filter(checkin_date__in=set(chunk) - {o.checkin_date for o in objs}).delete()
+        written += len(objs)
+    if ordered:
+        bump_data_version("booking", *year_versions("booking", _years(ordered)))
+    return written
+
+@transaction.atomic
+def rebuild_booking_rollup() -> int:
+    years = booking_rollup_years()
+    BookingDailyRollup.objects.all().delete()
+    objs = _booking_rollup_rows(Booking.objects.all())
+    BookingDailyRollup.objects.bulk_create(objs, batch_size=DATE_CHUNK)
+    years |= _years(o.checkin_date for o in objs)
+    bump_data_version("booking", *year_versions("booking", years))
+    return len(objs)
+
+def booking_rollup_qs(d1: date | None = None, d2: date | None = None):
+    qs = BookingDailyRollup.objects.all()
+    if d1:
+        qs = qs.filter(checkin_date__gte=d1)
+    if d2:
+        qs = qs.filter(checkin_date__lte=d2)
+    return qs
+
+def booking_days(d1: date | None = None, d2: date | None = None) -> dict:
+    """{checkin_date: BookingDailyRollup} in one read, for callers that need several booking metrics."""
+    return {r.checkin_date: r for r in booking_rollup_qs(d1, d2)}
+
+def lead_counts(row) -> dict:
+    return {b: getattr(row, f"lead_{b}") for b in LEAD_BUCKETS}
@@ -0,0 +1,30 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from core.cache import bump_data_version
+from core.models import Booking, InventoryDay
+from core.services.rollup_service import refresh_booking_rollup
+
+
+@receiver(pre_save, sender=Booking)
+def _remember_old_checkin(sender, instance, **kwargs):
+    old = None
+    if instance.pk:
+        old = Booking.objects.filter(pk=instance.pk).values_list("checkin_date", flat=True).first()
+    instance._rollup_old_checkin = old
+
+
+@receiver(post_save, sender=Booking)
+def _booking_saved(sender, instance, **kwargs):
+    refresh_booking_rollup({instance.checkin_date, getattr(instance, "_rollup_old_checkin", None)})
+
+
+@receiver(post_delete, sender=Booking)
+def _booking_deleted(sender, instance, **kwargs):
+    refresh_booking_rollup({instance.checkin_date})
+
+
+@receiver(post_save, sender=InventoryDay)
+@receiver(post_delete, sender=InventoryDay)
+def _inventory_changed(sender, **kwargs):
+    bump_data_version("inventory")
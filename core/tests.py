@@ -1,3 +1,391 @@
+import csv
+import io
+import os
+import tempfile
+import warnings
+from collections import Counter
+from datetime import date, timedelta
+from unittest import mock
+
+import pandas as pd
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import caches
+from django.core.cache.backends.base import CacheKeyWarning
+from django.db.models import Count
 from django.test import TestCase
+from django.utils import timezone
+
+from core.cache import CACHE_ALIAS, cache_stats, data_versions
+from core.helpers import period_key, period_rows
+from core.jobs import JOB_HANDLERS, run_job, submit_job
+from core.models import BackgroundJob, Booking, BookingDailyRollup, RevenueForecast
+from core.services.backtest_service import _metrics, backtest
+from core.services.downsample import downsample_rows
+from core.disk_store import DiskLRUStore
+from core.services import fast_forecast, forecast_service
+from core.services.forecast_service import (
+    arima_fit_cost_ms, fitted_arima, forecast_many, forecast_with_engine, save_precomputed,
+)
+from core.models_ft import FinancialTransaction as FT, FTDailyRollup, FTIngestWatermark
+
+
+def write_ft_csv(dirname, name, rows):
+    """
+    rows: [(pkid, resort, business_date, revenue_amt[, jrn_update_dttm]), ...]
+    -> path of a load_ft_csv file.
+    """
+    path = os.path.join(dirname, name)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["pkid", "resort", "business_date", "revenue_amt", "net_amount", "jrn_update_dttm"])
+        for pkid, resort, bdate, rev, *dttm in rows:
+            w.writerow([pkid, resort, bdate, rev, rev, dttm[0] if dttm else ""])
+    return path
+
+
+def load_ft(*paths, **opts):
+    call_command("load_ft_csv", *paths, stdout=io.StringIO(), **opts)
+
+
+class LoadFtCsvTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_parallel_ranges_match_in_process_conversion(self):
+        from core.management.commands.load_ft_csv import converted_batches
+        a = os.path.join(self.tmp.name, "a.csv")
+        with open(a, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, lineterminator="\r\n")
+            w.writerow(["pkid", "resort", "business_date", "trx_code_desc", "revenue_amt"])
+            for i in range(1, 24):
+                w.writerow([i, "LON", f"2025-01-{i:02d}", f'line {i}\n"quoted", ok' if i % 5 == 0 else f"x{i}", i])
+        b = write_ft_csv(self.tmp.name, "b.csv", [(100, "MAD", "2025-02-01", "7")])
+        fields = [f.attname for f in FT._meta.concrete_fields]
+        rows = lambda workers: [
+            [tuple(getattr(o, n) for n in fields) for o in batch] for batch in converted_batches([a, b], 5, workers)
+        ]
+        serial = rows(1)
+        self.assertEqual([len(batch) for batch in serial], [5, 5, 5, 5, 3, 1])
+        self.assertEqual(rows(2), serial)
+        self.assertIn('line 5\n"quoted", ok', [r[fields.index("trx_code_desc")] for r in serial[0]])
+
+    def test_reloading_the_same_file_updates_rows(self):
+        path = write_ft_csv(self.tmp.name, "a.csv", [(1, "LON", "2025-01-01", "10"), (2, "LON", "2025-01-02", "20")])
+        load_ft(path)
+        load_ft(path)
+        self.assertEqual(FT.objects.count(), 2)
+
+        path = write_ft_csv(self.tmp.name, "a.csv", [(1, "LON", "2025-01-01", "15"), (2, "LON", "2025-01-03", "20")])
+        load_ft(path)
+        self.assertEqual(float(FT.objects.get(pkid=1).revenue_amt), 15.0)
+        # the day row 2 moved away from is rebuilt as well
+        days = dict(FTDailyRollup.objects.filter(resort="LON").values_list("business_date", "revenue"))
+        self.assertEqual({d: float(v) for d, v in days.items()},
+                         {date(2025, 1, 1): 15.0, date(2025, 1, 3): 20.0})
+
+    def test_incremental_keeps_rows_older_than_the_resort_watermark(self):
+        load_ft(write_ft_csv(self.tmp.name, "d1.csv", [
+            (1, "R1", "2025-06-01", "10", "2025-07-01 00:00:00"),
+            (2, "R1", "2025-05-01", "20", "2025-05-01 00:00:00"),
+        ]), incremental=True)
+        self.assertEqual(FTIngestWatermark.objects.get(resort="R1").last_jrn_update_dttm.date(), date(2025, 7, 1))
+
+        out = io.StringIO()
+        call_command("load_ft_csv", write_ft_csv(self.tmp.name, "d2.csv", [
+            (1, "R1", "2025-06-01", "99", "2025-06-01 00:00:00"),        # older than the stored row: skipped
+            (2, "R1", "2025-05-01", "25", "2025-06-01 00:00:00"),        # correction, older than the watermark
+            (500000, "R1", "2025-05-02", "5", "2025-06-15 00:00:00"),    # never stored
+        ]), incremental=True, stdout=out)
+        revenue = {pk: float(v) for pk, v in FT.objects.values_list("pkid", "revenue_amt")}
+        self.assertEqual(revenue, {1: 10.0, 2: 25.0, 500000: 5.0})
+        self.assertIn("Skipped 1 ", out.getvalue())
+
+    def test_failed_load_still_refreshes_rollup_and_version(self):
+        good = write_ft_csv(self.tmp.name, "a.csv", [(1, "LON", "2025-01-01", "10")])
+        bad = os.path.join(self.tmp.name, "b.csv")
+        with open(bad, "w") as f:
+            f.write("resort,business_date\nLON,2025-01-02\n")   # no pkid column
+        before = data_versions(("ft",))[0]
+        with self.assertRaises(CommandError):
+            load_ft(good, bad)
+        self.assertEqual(FT.objects.count(), 1)
+        self.assertTrue(FTDailyRollup.objects.filter(business_date=date(2025, 1, 1)).exists())
+        self.assertGreater(data_versions(("ft",))[0], before)
+
+    def test_failed_incremental_load_leaves_watermarks_alone(self):
+        good = write_ft_csv(self.tmp.name, "a.csv", [(1, "LON", "2025-01-01", "10", "2025-01-05 00:00:00")])
+        bad = os.path.join(self.tmp.name, "b.csv")
+        with open(bad, "w") as f:
+            f.write("resort,business_date\nLON,2025-01-02\n")
+        with self.assertRaises(CommandError):
+            load_ft(good, bad, incremental=True)
+        self.assertFalse(FTIngestWatermark.objects.exists())
+        self.assertTrue(FTDailyRollup.objects.filter(business_date=date(2025, 1, 1)).exists())
+
+
+class BookingRollupTests(TestCase):
+    def rollup(self):
+        return dict(BookingDailyRollup.objects.values_list("checkin_date", "total"))
+
+    def test_rollup_follows_booking_writes(self):
+        d1, d2 = date(2025, 3, 1), date(2025, 3, 2)
+        a = Booking.objects.create(checkin_date=d1)
+        Booking.objects.create(checkin_date=d1, status="CANCELLED")
+        self.assertEqual(self.rollup(), {d1: 2})
+        self.assertEqual(BookingDailyRollup.objects.get(checkin_date=d1).cancelled, 1)
+
+        a.checkin_date = d2
+        a.save()
+        self.assertEqual(self.rollup(), {d1: 1, d2: 1})
+
+        a.delete()   # a day left without bookings loses its rollup row
+        self.assertEqual(self.rollup(), {d1: 1})
+
+
+class PeriodRowsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # spans ISO-week and year boundaries (2024-12-30 is in 2025-W01, 2027-01-01 in 2026-W53)
+        start = date(2024, 12, 20)
+        cls.dates = [start + timedelta(days=i * 3) for i in range(20)] + [date(2026, 12, 31), date(2027, 1, 1)]
+        Booking.objects.bulk_create(Booking(checkin_date=d) for d in cls.dates + cls.dates[::4])
+
+    def test_matches_python_grouping(self):
+        # what the views computed in Python before the GROUP BY moved into SQL
+        for grp in ("day", "week", "month"):
+            expected = Counter(period_key(b.checkin_date, grp) for b in Booking.objects.all())
+            rows = period_rows(Booking.objects.all(), "checkin_date", grp, n=Count("id"))
+            self.assertEqual([(r["period"], r["n"]) for r in rows], sorted(expected.items()), grp)
+
+    def test_by_adds_leading_group_columns(self):
+        rows = period_rows(Booking.objects.all(), "checkin_date", "month", by=("status",), n=Count("id"))
+        self.assertEqual({r["status"] for r in rows}, {"CONFIRMED"})
+        self.assertEqual(sum(r["n"] for r in rows), Booking.objects.count())
+
+
+class ApiCacheTests(TestCase):
+    url = "/api/ft/summary?resort=LON"
+
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()   # versions restart with every test database
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        load_ft(write_ft_csv(self.tmp.name, "a.csv", [(1, "LON", "2025-01-01", "10")]))
+
+    def revenue(self):
+        return self.client.get(self.url).json()["revenue"]
+
+    def test_cached_until_the_data_version_moves(self):
+        self.assertEqual(self.revenue(), 10.0)
+        hits = cache_stats()["hits"]
+        self.assertEqual(self.revenue(), 10.0)
+        self.assertEqual(cache_stats()["hits"], hits + 1)
+
+        load_ft(write_ft_csv(self.tmp.name, "b.csv", [(2, "LON", "2025-01-02", "5")]))
+        self.assertEqual(self.revenue(), 15.0)
+
+    def test_streamed_extract_gets_validators(self):
+        url = "/api/ft/extract?resort=LON"
+        first = self.client.get(url)
+        self.assertTrue(first.streaming)
+        self.assertEqual(b"".join(first.streaming_content).count(b'"pkid"'), 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+    def test_etag_304_flow(self):
+        first = self.client.get(self.url)
+        etag = first["ETag"]
+        self.assertTrue(first.has_header("Last-Modified"))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # normalized params: same query, different spelling, same validator
+        self.assertEqual(self.client.get(self.url + "&date_from=", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        load_ft(write_ft_csv(self.tmp.name, "b.csv", [(2, "LON", "2025-01-02", "5")]))
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 200)
+        self.assertNotEqual(again["ETag"], etag)
+
+
+def echo_job(params):
+    return {"echo": params}
+
+
+@mock.patch("core.jobs.get_pool")
+class JobTests(TestCase):
+    params = {"resort": "LON", "horizon": 7}
+
+    def test_identical_in_flight_job_is_deduplicated(self, get_pool):
+        job, dedup = submit_job("forecast", self.params)
+        again, dedup_again = submit_job("forecast", dict(reversed(self.params.items())))
+        self.assertEqual((dedup, dedup_again), (False, True))
+        self.assertEqual(again.pk, job.pk)
+        self.assertEqual(get_pool.return_value.submit.call_count, 1)
+
+    def test_key_length_is_bounded(self, get_pool):
+        params = {"resorts": [f"RESORT{i:04d}" for i in range(300)], "years": list(range(2000, 2030)), "fmt": "csv"}
+        job, _ = submit_job("batch_export", params)
+        self.assertLessEqual(len(job.key), BackgroundJob._meta.get_field("key").max_length)
+        self.assertEqual(submit_job("batch_export", dict(reversed(params.items()))), (job, True))
+
+    def test_orphaned_job_no_longer_blocks_its_key(self, get_pool):
+        job, _ = submit_job("forecast", self.params)
+        long_ago = timezone.now() - timedelta(hours=1)
+        BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.RUNNING, heartbeat_ts=long_ago)
+
+        fresh, dedup = submit_job("forecast", self.params)
+        self.assertFalse(dedup)
+        self.assertNotEqual(fresh.pk, job.pk)
+        self.assertEqual(BackgroundJob.objects.get(pk=job.pk).status, BackgroundJob.FAILED)
+
+    def test_recent_heartbeat_keeps_deduplicating(self, get_pool):
+        job, _ = submit_job("forecast", self.params)
+        BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.RUNNING, heartbeat_ts=timezone.now())
+        self.assertEqual(submit_job("forecast", self.params), (BackgroundJob.objects.get(pk=job.pk), True))
+
+    @mock.patch.dict(JOB_HANDLERS, {"forecast": "core.tests.echo_job"})
+    def test_run_job_skips_jobs_given_up_before_they_start(self, get_pool):
+        job, _ = submit_job("forecast", self.params)
+        BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.FAILED)
+        run_job(job.pk)
+        self.assertEqual(BackgroundJob.objects.get(pk=job.pk).status, BackgroundJob.FAILED)
+
+        job, _ = submit_job("forecast", {"resort": "MAD"})
+        run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (BackgroundJob.DONE, {"echo": {"resort": "MAD"}}))
+
+
+class PrecomputedForecastTests(TestCase):
+    def test_save_prunes_superseded_windows(self):
+        save_precomputed("LON", date(2025, 1, 1), date(2025, 6, 30), 1, [1.0, 2.0])
+        save_precomputed("MAD", date(2025, 1, 1), date(2025, 6, 30), 1, [1.0])
+        save_precomputed("LON", date(2025, 1, 2), date(2025, 7, 1), 2, [3.0, 4.0])
+        save_precomputed("LON", date(2025, 1, 2), date(2025, 7, 1), 3, [5.0, 6.0])
+        self.assertEqual(
+            list(RevenueForecast.objects.filter(resort="LON").values_list("train_to", "data_version", "value")),
+            [(date(2025, 7, 1), 3, 5.0), (date(2025, 7, 1), 3, 6.0)],
+        )
+        self.assertEqual(RevenueForecast.objects.filter(resort="MAD").count(), 1)
+
+    def test_resorts_without_data_are_reported(self):
+        out = io.StringIO()
+        call_command("precompute_forecasts", "--resort", "NOPE", stdout=out)
+        self.assertIn("skipped: NOPE", out.getvalue())
+        self.assertIn("1 skipped without data", out.getvalue())
+
+
+class ForecastParamTests(TestCase):
+    def test_non_integer_params_are_a_400(self):
+        for q in ("latency_budget_ms=abc", "months=x", "horizon=1.5"):
+            resp = self.client.get(f"/api/forecast/revenue?resort=LON&{q}")
+            self.assertEqual(resp.status_code, 400, q)
+            self.assertIn("error", resp.json())
+
+
+class ForecastEngineTests(TestCase):
+    d1, d2 = date(2025, 1, 1), date(2025, 3, 1)
+
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(forecast_service, "_fit_store", DiskLRUStore(self.tmp.name, max_entries=16))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def series(self, k):
+        return {self.d1 + timedelta(days=i): float(100 * k + (i * k) % 7 * 10 + i) for i in range(60)}
+
+    def test_cold_fit_cost_is_measured(self):
+        with self.settings(ARIMA_COLD_FIT_MS=10**9):
+            self.assertEqual(arima_fit_cost_ms("LON", self.d1, self.d2), 10**9)
+            s = self.series(1)
+            fitted_arima("LON", self.d1, self.d2, pd.Series(list(s.values()), index=pd.to_datetime(list(s))))
+            self.assertEqual(arima_fit_cost_ms("LON", self.d1, self.d2), 0)
+            # the next window of the same length costs what the last fit took
+            cost = arima_fit_cost_ms("LON", self.d1 + timedelta(days=1), self.d2 + timedelta(days=1))
+            self.assertTrue(0 < cost < 10**9, cost)
+
+    def test_fan_out_matches_single_resort_and_runs_each_model_once(self):
+        series = {r: self.series(k) for k, r in enumerate(("LON", "MAD", "PAR"), start=1)}
+        series["LON"] = {dt: 5.0 * i for i, dt in enumerate(series["LON"])}
+        for engine in ("auto", "drift"):
+            many = forecast_many(series, self.d1, self.d2, horizon=14, engine=engine, latency_budget_ms=1)
+            if engine == "auto":
+                self.assertEqual([many[r]["model"] for r in series], ["drift", "holt_winters", "holt_winters"])
+            for r, s in series.items():
+                single = forecast_with_engine(r, self.d1, self.d2, horizon=14, engine=engine,
+                                              latency_budget_ms=1, series=s)
+                self.assertEqual(many[r], single, (engine, r))
+        with mock.patch.object(fast_forecast, "forecast_matrix", wraps=fast_forecast.forecast_matrix) as fm:
+            forecast_many(series, self.d1, self.d2, horizon=14, engine="drift")
+        self.assertEqual(fm.call_count, 1)
+
+
+class BacktestMetricsTests(TestCase):
+    def test_steps_without_nonzero_actuals_have_no_mape(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            m = _metrics([[1, 2, 3], [2, 2, 6]], [[1, 0, 4], [4, 0, 4]], 3)
+        self.assertEqual(m["mape_by_h"], [25.0, None, 37.5])
+        self.assertEqual(m["mape"], 31.25)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertIsNone(_metrics([[1, 2]], [[0, 0]], 2)["mape"])
+
+
+class BacktestCacheTests(TestCase):
+    def test_cache_keys_are_backend_safe(self):
+        caches[CACHE_ALIAS].clear()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", CacheKeyWarning)
+            first = backtest("LON", date(2025, 1, 1), date(2025, 6, 30), horizon=7, folds=2, models=("drift",))
+            self.assertEqual(backtest("LON", date(2025, 1, 1), date(2025, 6, 30), horizon=7, folds=2, models=("drift",)),
+                             first)
+
+
+class DownsampleTests(TestCase):
+    rows = [{"i": i, "v": float((i * 37) % 101)} for i in range(500)]
+
+    def test_never_returns_more_than_max_points(self):
+        for method in ("lttb", "minmax"):
+            for max_points in (1, 2, 3, 4, 5, 7, 50, 499):
+                out = downsample_rows(self.rows, max_points, "v", method)
+                self.assertLessEqual(len(out), max_points, (method, max_points))
+                self.assertEqual([r["i"] for r in out], sorted(r["i"] for r in out))
+            self.assertEqual(downsample_rows(self.rows, 500, "v", method), self.rows)
+
+    def test_minmax_keeps_end_points_and_extremes(self):
+        out = downsample_rows(self.rows, 10, "v", "minmax")
+        self.assertEqual((out[0]["i"], out[-1]["i"]), (0, 499))
+        self.assertIn(100.0, [r["v"] for r in out])
+        self.assertIn(0.0, [r["v"] for r in out])
+
+
+class ResortFanInTests(TestCase):
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        load_ft(write_ft_csv(self.tmp.name, "a.csv", [
+            (1, "LON", "2025-01-01", "10"), (2, "LON", "2025-01-09", "20"), (3, "MAD", "2025-01-02", "7"),
+        ]))
+
+    def test_each_resort_matches_its_single_resort_response(self):
+        for path in ("/api/ft/summary", "/api/ft/timeseries/revenue", "/api/trends/revenue?grp=week"):
+            sep = "&" if "?" in path else "?"
+            multi = self.client.get(f"{path}{sep}resort=MAD,LON,NOPE").json()["resorts"]
+            self.assertEqual(list(multi), ["LON", "MAD", "NOPE"], path)
+            for resort in ("LON", "MAD", "NOPE"):
+                self.assertEqual(multi[resort], self.client.get(f"{path}{sep}resort={resort}").json(), (path, resort))
+            every = self.client.get(f"{path}{sep}resort=*").json()["resorts"]
+            self.assertEqual(every, {r: multi[r] for r in ("LON", "MAD")}, path)
 
-# Create your tests here.
+    def test_columnar_layout_applies_per_resort(self):
+        url = "/api/ft/timeseries/revenue?resort=LON,MAD&layout=columnar"
+        series = self.client.get(url).json()["resorts"]["LON"]["series"]
+        self.assertEqual(series["date"], ["2025-01-01", "2025-01-09"])
+        self.assertEqual(series["revenue"], [10.0, 20.0])
@@ -10,12 +10,21 @@ urlpatterns = [
     # API endpoints
     re_path(r"^ft/summary/?$", views.ft_summary, name="ft_summary"),
     re_path(r"^ft/timeseries/revenue/?$", views.ft_timeseries_revenue, name="ft_timeseries_revenue"),
+    re_path(r"^ft/extract/?$", views.ft_extract, name="ft_extract"),
     re_path(r"^trends/occupancy/?$", views.trends_occupancy, name="trends_occupancy"),
     re_path(r"^trends/booking_rate/?$", views.trends_booking_rate, name="trends_booking_rate"),
     re_path(r"^trends/revenue/?$", views.trends_revenue, name="trends_revenue"),
     re_path(r"^trends/cancellations/?$", views.trends_cancellations, name="trends_cancellations"),
     re_path(r"^trends/lead_time/?$", views.trends_lead_time, name="trends_lead_time"),
+    re_path(r"^dashboard/revenue_booking/?$", views.dashboard_revenue_booking, name="dashboard_revenue_booking"),
     re_path(r"^prep/timeseries/?$", views.prep_timeseries_dataset, name="prep_timeseries_dataset"),
     re_path(r"^export/year_excel/?$", views.export_year_excel, name="export_year_excel"),
+    re_path(r"^export/batch/?$", views.export_batch_submit, name="export_batch_submit"),
+    re_path(r"^export/batch/(?P<job_id>\d+)/?$", views.export_batch_status, name="export_batch_status"),
+    re_path(r"^export/batch/(?P<job_id>\d+)/download/?$", views.export_batch_download, name="export_batch_download"),
     re_path(r"^forecast/revenue/?$", views.forecast_revenue, name="forecast_revenue"),
+    re_path(r"^forecast/backtest/?$", views.forecast_backtest, name="forecast_backtest"),
+    re_path(r"^forecast/jobs/?$", views.forecast_job_submit, name="forecast_job_submit"),
+    re_path(r"^forecast/jobs/(?P<job_id>\d+)/?$", views.forecast_job_status, name="forecast_job_status"),
+    re_path(r"^cache/stats/?$", views.api_cache_stats, name="api_cache_stats"),
 ]
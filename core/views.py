@@ -1,23 +1,31 @@
-import os
 import random
 import math
 from django.shortcuts import render
-from collections import defaultdict
 from datetime import datetime, date, timedelta
 
-from django.http import JsonResponse, HttpResponse
-from django.db.models import Sum, Count
+from django.http import JsonResponse, FileResponse
+from django.db.models import Sum, Count, Q
+from django.db.models.functions import ExtractIsoWeekDay, ExtractMonth
 from django.utils.dateparse import parse_date
-from django.views.decorators.http import require_GET
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 
 from .models_ft import FinancialTransaction as FT
-from .models import InventoryDay, Booking
-
-from .helpers import parse_dates, ensure_range, export_excel, group_param, period_key
-from .services.revenue_service import revenue_series, bookings_series, avg_revenue_per_booking, model_ready_rows
-from .services.cancellation_service import canc_noshow_series
-from .services.leadtime_service import leadtime_distribution
-from .services.forecast_service import arima_forecast_series
+from .models import InventoryDay, Booking, BackgroundJob
+from .jobs import submit_job, job_payload
+from .cache import cached_api, conditional_api, cache_stats
+from .serializers import api_response
+
+from .helpers import (parse_dates, ensure_range, group_param, period_rows, series_response,
+                      max_points_param, downsample_param, resorts_param, fill_missing_dates, LEAD_BUCKETS)
+from .services.revenue_service import revenue_series, bookings_series, iter_model_ready_rows, ft_totals, iter_ft_revenue_timeseries
+from .services.revenue_service import ft_totals_by_resort, ft_revenue_timeseries_by_resort, revenue_series_by_resort
+from .services.forecast_service import training_window, revenue_forecast, revenue_forecasts
+from .services.backtest_service import backtest, CANDIDATES, DEFAULT_HORIZON, DEFAULT_FOLDS, DEFAULT_STEP
+from .services.rollup_service import rollup_qs, booking_rollup_qs
+from .services.dashboard_service import revenue_booking_dashboard
+from .services.downsample import downsample_rows
+from .services.export_service import year_workbook, parse_years, batch_export_path, FORMATS as EXPORT_FORMATS
 
 
 def _demo_dates(count=90, step_days=1, start=None):
@@ -74,73 +82,85 @@ def _demo_forecast_from_series(series, horizon=56):
 
 
 @require_GET
+@conditional_api("ft")
+@cached_api("ft")
 def ft_summary(request):
     """
     GET /api/ft/summary?resort=XYZ&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    resort=A,B,C or resort=* returns {"resorts": {resort: totals}} from one grouped query.
     """
     resort = request.GET.get("resort")
     d1 = parse_date(request.GET.get("date_from") or "")
     d2 = parse_date(request.GET.get("date_to") or "")
 
-    qs = FT.objects.all()
-    if resort:
-        qs = qs.filter(resort=resort)
-    if d1:
-        qs = qs.filter(business_date__gte=d1)
-    if d2:
-        qs = qs.filter(business_date__lte=d2)
-
-    agg = qs.aggregate(
-        rows=Count("pkid"),
-        revenue=Sum("revenue_amt"),
-        gross=Sum("gross_amount"),
-        net=Sum("net_amount"),
-        non_revenue=Sum("non_revenue_amount"),
-    )
-    out = {k: (float(v) if v is not None else 0.0) for k, v in agg.items()}
-    return JsonResponse(out)
+    resorts = resorts_param(request)
+    if resorts is not None:
+        return api_response(request, {"resorts": ft_totals_by_resort(resorts, d1, d2)})
+    out = ft_totals(resort, d1, d2)
+    return api_response(request, out)
 
 @require_GET
+@conditional_api("ft")
+@cached_api("ft")
 def ft_timeseries_revenue(request):
     """
-    GET /api/ft/timeseries/revenue?resort=XYZ&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    GET /api/ft/timeseries/revenue?resort=XYZ&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD[&format=ndjson|stream]
+    max_points=N[&downsample=lttb|minmax] thins the series server-side (peaks kept).
+    resort=A,B,C or resort=* returns {"resorts": {resort: {"series": [...]}}} from one grouped query.
     """
     resort = request.GET.get("resort")
     d1 = parse_date(request.GET.get("date_from") or "")
     d2 = parse_date(request.GET.get("date_to") or "")
 
-    qs = FT.objects.values("business_date")
+    resorts = resorts_param(request)
+    max_points = max_points_param(request)
+    if resorts is not None:
+        method = downsample_param(request)
+        by_resort = ft_revenue_timeseries_by_resort(resorts, d1, d2)
+        return api_response(request, {"resorts": {
+            r: {"series": downsample_rows(rows, max_points, "revenue", method)} for r, rows in by_resort.items()
+        }})
+    rows = iter_ft_revenue_timeseries(resort, d1, d2)
+    if max_points:
+        rows = downsample_rows(list(rows), max_points, "revenue", downsample_param(request))
+    return series_response(request, rows)
+
+# columns /api/ft/extract returns when `fields` is not given
+FT_EXTRACT_FIELDS = ("pkid", "resort", "business_date", "trx_code", "revenue_amt", "net_amount", "gross_amount", "non_revenue_amount")
+
+@require_GET
+@conditional_api("ft")
+def ft_extract(request):
+    """
+    GET /api/ft/extract?resort=XYZ&date_from=&date_to=&fields=pkid,resort,...[&format=stream|ndjson]
+    Raw financial_transaction rows ordered by business_date, pkid. Always streamed
+    (chunked JSON array by default) straight from a server-side iterator.
+    """
+    resort = request.GET.get("resort")
+    d1, d2 = parse_dates(request)
+    allowed = {f.name for f in FT._meta.concrete_fields}
+    fields = [f.strip() for f in (request.GET.get("fields") or "").split(",") if f.strip()] or list(FT_EXTRACT_FIELDS)
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        return JsonResponse({"error": f"unknown field(s): {', '.join(unknown)}"}, status=400)
+
+    qs = FT.objects.all()
     if resort:
         qs = qs.filter(resort=resort)
     if d1:
         qs = qs.filter(business_date__gte=d1)
     if d2:
         qs = qs.filter(business_date__lte=d2)
-
-    rows = (
-        qs.annotate(
-            revenue=Sum("revenue_amt"),
-            gross=Sum("gross_amount"),
-            net=Sum("net_amount"),
-        )
-        .order_by("business_date")
-    )
-
-    data = [
-        {
-            "date": r["business_date"].isoformat(),
-            "revenue": float(r["revenue"] or 0),
-            "gross": float(r["gross"] or 0),
-            "net": float(r["net"] or 0),
-        }
-        for r in rows
-    ]
-    return JsonResponse({"series": data})
+    rows = qs.order_by("business_date", "pkid").values(*fields).iterator(chunk_size=2000)
+    return series_response(request, rows, key="rows", default_format="stream")
 
 @require_GET
+@conditional_api("inventory")
+@cached_api("inventory")
 def trends_occupancy(request):
     """
     GET /api/trends/occupancy?location_id=<id>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&grp=day|week|month
+    max_points=N[&downsample=lttb|minmax] thins the series server-side (peaks kept).
     """
     if request.GET.get("demo") == "1":
         step = 7 if (request.GET.get("grp") or "week") == "week" else 1
@@ -156,7 +176,7 @@ def trends_occupancy(request):
                 "occupied": occ,
                 "occupancy_rate": round(occ/cap, 4)
             })
-        return JsonResponse({"series": series})
+        return api_response(request, {"series": series})
     
     grp = group_param(request)
     d1, d2 = parse_dates(request)
@@ -170,26 +190,23 @@ def trends_occupancy(request):
     if d2:
         qs = qs.filter(date__lte=d2)
 
-    bucket = defaultdict(lambda: {"capacity": 0, "occupied": 0})
-    for row in qs.values("date", "capacity", "occupied"):
-        key = period_key(row["date"], grp)
-        bucket[key]["capacity"] += int(row["capacity"] or 0)
-        bucket[key]["occupied"] += int(row["occupied"] or 0)
-
     series = []
-    for k in sorted(bucket.keys()):
-        cap = bucket[k]["capacity"] or 0
-        occ = bucket[k]["occupied"] or 0
+    for row in period_rows(qs, "date", grp, capacity=Sum("capacity"), occupied=Sum("occupied")):
+        cap = int(row["capacity"] or 0)
+        occ = int(row["occupied"] or 0)
         rate = (occ / cap) if cap > 0 else 0.0
         series.append({
-            "period": k,
+            "period": row["period"],
             "capacity": cap,
             "occupied": occ,
             "occupancy_rate": round(rate, 4),
         })
-    return JsonResponse({"series": series})
+    series = downsample_rows(series, max_points_param(request), "occupancy_rate", downsample_param(request))
+    return api_response(request, {"series": series})
 
 @require_GET
+@conditional_api("booking")
+@cached_api("booking")
 def trends_booking_rate(request):
     """
     GET /api/trends/booking_rate?date_from=&date_to=&grp=day|week|month
@@ -199,38 +216,30 @@ def trends_booking_rate(request):
     if request.GET.get("demo") == "1":
         step = 7 if (request.GET.get("grp") or "week") == "week" else 1
         demo = _demo_booking_rate(count=90, step_days=step)
-        return JsonResponse(demo)
+        return api_response(request, demo)
     
     grp = group_param(request)
     d1, d2 = parse_dates(request)
 
-    qs = Booking.objects.all()
-    if d1:
-        qs = qs.filter(checkin_date__gte=d1)
-    if d2:
-        qs = qs.filter(checkin_date__lte=d2)
+    qs = booking_rollup_qs(d1, d2)
+    series = [
+        {"period": r["period"], "bookings": r["bookings"]}
+        for r in period_rows(qs, "checkin_date", grp, bookings=Sum("total"))
+    ]
 
-    bucket = defaultdict(int)
     # Seasonality
     weekday_counts = [0]*7
     weekday_days = [0]*7
     month_counts = [0]*12
     month_days = [0]*12
 
-    for b in qs.values("checkin_date"):
-        dt = b["checkin_date"]
-        key = period_key(dt, grp)
-        bucket[key] += 1
-
-        wd = dt.weekday()  
-        weekday_counts[wd] += 1
-        weekday_days[wd] += 1
+    for wd, n in qs.annotate(wd=ExtractIsoWeekDay("checkin_date")).values("wd").annotate(n=Sum("total")).values_list("wd", "n").order_by():
+        weekday_counts[wd - 1] += n
+        weekday_days[wd - 1] += n
 
-        m = dt.month - 1  
-        month_counts[m] += 1
-        month_days[m] += 1
-
-    series = [{"period": k, "bookings": bucket[k]} for k in sorted(bucket.keys())]
+    for m, n in qs.annotate(m=ExtractMonth("checkin_date")).values("m").annotate(n=Sum("total")).values_list("m", "n").order_by():
+        month_counts[m - 1] += n
+        month_days[m - 1] += n
 
     # simple average per weekday/month 
     weekday_avg = []
@@ -243,39 +252,30 @@ def trends_booking_rate(request):
         denom = max(month_days[i], 1)
         month_avg.append(round(month_counts[i] / denom, 4))
 
-    return JsonResponse({"series": series, "weekday_avg": weekday_avg, "month_avg": month_avg})
+    return api_response(request, {"series": series, "weekday_avg": weekday_avg, "month_avg": month_avg})
 
 @require_GET
+@conditional_api("ft", "booking")
+@cached_api("ft", "booking")
 def trends_revenue(request):
     """
     GET /api/trends/revenue?resort=XYZ&date_from=&date_to=&grp=day|week|month
     - Uses FinancialTransaction.revenue_amt (fallback to net_amount).
     - Computes avg_rev_per_booking and (if available) per_customer.
+    - max_points=N[&downsample=lttb|minmax] thins the series server-side (peaks kept).
+    - resort=A,B,C or resort=* returns {"resorts": {resort: {"series": [...]}}}; revenue comes
+      from one GROUP BY resort query and the (resort-less) booking counts are shared.
     """
 
     if request.GET.get("demo") == "1":
         step = 7 if (request.GET.get("grp") or "week") == "week" else 1
         series = _demo_revenue_series(count=90, step_days=step)
-        return JsonResponse({"series": series})
+        return api_response(request, {"series": series})
     
     grp = group_param(request)
     d1, d2 = parse_dates(request)
     resort = request.GET.get("resort")
-
-    ft = FT.objects.all()
-    if resort:
-        ft = ft.filter(resort=resort)
-    if d1:
-        ft = ft.filter(business_date__gte=d1)
-    if d2:
-        ft = ft.filter(business_date__lte=d2)
-
-    revenue_by_day = defaultdict(float)
-    for r in ft.values("business_date", "revenue_amt", "net_amount"):
-        dt = r["business_date"]
-        key = period_key(dt, grp)
-        rev = r["revenue_amt"] if r["revenue_amt"] is not None else r["net_amount"]
-        revenue_by_day[key] += float(rev or 0.0)
+    resorts = resorts_param(request)
 
     # bookings per same period (arrival-based)
     bk = Booking.objects.all()
@@ -283,46 +283,61 @@ def trends_revenue(request):
         bk = bk.filter(checkin_date__gte=d1)
     if d2:
         bk = bk.filter(checkin_date__lte=d2)
-    bookings_by_day = defaultdict(int)
-    customers_by_day = defaultdict(set)
 
     has_customer = "customer_id" in [f.name for f in Booking._meta.get_fields()]
-    fields = ["checkin_date", "id"]
+    aggs = {"bookings": Count("id")}
     if has_customer:
-        fields.append("customer_id")
-
-    for b in bk.values(*fields):
-        dt = b["checkin_date"]
-        key = period_key(dt, grp)
-        bookings_by_day[key] += 1
-        if has_customer:
-            cid = b.get("customer_id")
-            if cid:
-                customers_by_day[key].add(cid)
+        aggs["customers"] = Count("customer_id", distinct=True, filter=~Q(customer_id=""))
 
-    
-    keys = sorted(set(revenue_by_day.keys()) | set(bookings_by_day.keys()))
-    series = []
-    for k in keys:
-        rev = revenue_by_day.get(k, 0.0)
-        bks = bookings_by_day.get(k, 0)
-        arb = (rev / bks) if bks > 0 else 0.0  
+    bookings_by_day = {}
+    customers_by_day = {}
+    for r in period_rows(bk, "checkin_date", grp, **aggs):
+        bookings_by_day[r["period"]] = r["bookings"]
         if has_customer:
-            uniq = len(customers_by_day.get(k, set()))
-            arc = (rev / uniq) if uniq > 0 else 0.0
-        else:
-            arc = None
-        series.append({
-            "period": k,
-            "revenue": round(rev, 2),
-            "bookings": bks,
-            "avg_rev_per_booking": round(arb, 2),
-            "avg_rev_per_customer": (round(arc, 2) if arc is not None else None),
-        })
+            customers_by_day[r["period"]] = r["customers"]
 
-    return JsonResponse({"series": series})
+    def build(revenue_by_day):
+        keys = sorted(set(revenue_by_day.keys()) | set(bookings_by_day.keys()))
+        series = []
+        for k in keys:
+            rev = revenue_by_day.get(k, 0.0)
+            bks = bookings_by_day.get(k, 0)
+            arb = (rev / bks) if bks > 0 else 0.0
+            if has_customer:
+                uniq = customers_by_day.get(k, 0)
+                arc = (rev / uniq) if uniq > 0 else 0.0
+            else:
+                arc = None
+            series.append({
+                "period": k,
+                "revenue": round(rev, 2),
+                "bookings": bks,
+                "avg_rev_per_booking": round(arb, 2),
+                "avg_rev_per_customer": (round(arc, 2) if arc is not None else None),
+            })
+        return downsample_rows(series, max_points_param(request), "revenue", downsample_param(request))
+
+    # daily rollup already applies the per-row revenue_amt -> net_amount fallback
+    if resorts is not None:
+        qs = rollup_qs(None, d1, d2).filter(resort__isnull=False)
+        if resorts:
+            qs = qs.filter(resort__in=resorts)
+        revenue_by_resort = {r: {} for r in resorts}
+        for r in period_rows(qs, "business_date", grp, by=("resort",), rev=Sum("revenue_or_net")):
+            revenue_by_resort.setdefault(r["resort"], {})[r["period"]] = float(r["rev"] or 0.0)
+        return api_response(request, {"resorts": {
+            r: {"series": build(rev)} for r, rev in sorted(revenue_by_resort.items())
+        }})
+
+    revenue_by_day = {
+        r["period"]: float(r["rev"] or 0.0)
+        for r in period_rows(rollup_qs(resort, d1, d2), "business_date", grp, rev=Sum("revenue_or_net"))
+    }
+    return api_response(request, {"series": build(revenue_by_day)})
 
 @require_GET
+@conditional_api("booking")
+@cached_api("booking")
 def trends_cancellations(request):
     """
     GET /api/trends/cancellations?date_from=&date_to=&grp=day|week|month&basis=created|confirmed|all
@@ -338,52 +353,30 @@ def trends_cancellations(request):
     if basis not in ("created", "confirmed", "all"):
         basis = "all"
 
-    qs = Booking.objects.all()
-    if d1:
-        qs = qs.filter(checkin_date__gte=d1)
-    if d2:
-        qs = qs.filter(checkin_date__lte=d2)
-
-    canc_by = defaultdict(int)
-    noshow_by = defaultdict(int)
-    denom_by = defaultdict(int)
-
-    for b in qs.values("checkin_date", "status", "cancellation_flag", "no_show_flag", "created_ts"):
-        dt = b["checkin_date"]
-        key = period_key(dt, grp)
-
-        is_cancel = (b["status"] == "CANCELLED") or bool(b["cancellation_flag"])
-        is_noshow = (b["status"] == "NO_SHOW") or bool(b["no_show_flag"])
-
-        if is_cancel:
-            canc_by[key] += 1
-        if is_noshow:
-            noshow_by[key] += 1
-
-        if basis == "created":
-            denom_by[key] += 1
-        elif basis == "confirmed":
-            denom_by[key] += 1 if b["status"] in ("CONFIRMED", "COMPLETED") else 0
-        else:
-            denom_by[key] += 1
-
-    keys = sorted(set(denom_by.keys()) | set(canc_by.keys()) | set(noshow_by.keys()))
+    rows = period_rows(
+        booking_rollup_qs(d1, d2), "checkin_date", grp,
+        cancelled=Sum("cancelled"),
+        no_show=Sum("no_show"),
+        denominator=Sum("confirmed" if basis == "confirmed" else "total"),
+    )
     series = []
-    for k in keys:
-        denom = denom_by.get(k, 0)
-        c = canc_by.get(k, 0)
-        n = noshow_by.get(k, 0)
+    for r in rows:
+        denom = r["denominator"] or 0
+        c = r["cancelled"] or 0
+        n = r["no_show"] or 0
         series.append({
-            "period": k,
+            "period": r["period"],
             "denominator": denom,
             "cancelled": c,
             "no_show": n,
             "cancel_rate": round(c/denom, 4) if denom else 0.0,
             "no_show_rate": round(n/denom, 4) if denom else 0.0,
         })
-    return JsonResponse({"series": series, "basis": basis})
+    return api_response(request, {"series": series, "basis": basis})
 
 @require_GET
+@conditional_api("booking")
+@cached_api("booking")
 def trends_lead_time(request):
     """
     GET /api/trends/lead_time?date_from=&date_to=&grp=day|week|month
@@ -396,39 +389,18 @@ def trends_lead_time(request):
     grp = group_param(request)
     d1, d2 = parse_dates(request)
 
-    qs = Booking.objects.all().values("created_ts", "checkin_date")
-    if d1:
-        qs = qs.filter(checkin_date__gte=d1)
-    if d2:
-        qs = qs.filter(checkin_date__lte=d2)
-
-    dist = defaultdict(lambda: {"early":0, "standard":0, "last_minute":0, "very_late":0, "total":0})
-    for b in qs:
-        created = b["created_ts"].date() if isinstance(b["created_ts"], datetime) else b["created_ts"]
-        checkin = b["checkin_date"]
-        if not created or not checkin:
-            continue
-        lead = (checkin - created).days
-        key = period_key(checkin, grp)
-
-        if lead >= 30:
-            bucket = "early"
-        elif 7 <= lead <= 29:
-            bucket = "standard"
-        elif 0 <= lead <= 6:
-            bucket = "last_minute"
-        else:
-            bucket = "very_late"
-
-        dist[key][bucket] += 1
-        dist[key]["total"] += 1
+    rows = period_rows(
+        booking_rollup_qs(d1, d2), "checkin_date", grp,
+        **{b: Sum(f"lead_{b}") for b in LEAD_BUCKETS}
+    )
 
     series = []
-    for k in sorted(dist.keys()):
-        row = dist[k]
-        tot = row["total"] or 1
+    for row in rows:
+        tot = sum(row[b] for b in LEAD_BUCKETS)
+        if not tot:
+            continue
         series.append({
-            "period": k,
+            "period": row["period"],
             "counts": {x: row[x] for x in ("early","standard","last_minute","very_late")},
             "share": {
                 "early": round(row["early"]/tot, 4),
@@ -437,12 +409,13 @@ def trends_lead_time(request):
                 "very_late": round(row["very_late"]/tot, 4),
             }
         })
-    return JsonResponse({"series": series})
+    return api_response(request, {"series": series})
 
 @require_GET
+@conditional_api("ft", "booking")
 def prep_timeseries_dataset(request):
     """
-    GET /api/prep/timeseries?resort=XYZ&months=6|12
+    GET /api/prep/timeseries?resort=XYZ&months=6|12[&format=ndjson|stream]
     Returns cleaned, continuous daily rows for revenue/bookings/avg_rev.
     """
     resort = request.GET.get("resort")
@@ -452,8 +425,9 @@ def prep_timeseries_dataset(request):
     d1, d2 = ensure_range(None, None, default_days=days)
     rev = revenue_series(resort, d1, d2)
     bks = bookings_series(d1, d2)
-    rows = model_ready_rows(rev, bks)
-    return JsonResponse({"rows": rows, "params": {"resort": resort, "date_from": d1.isoformat(), "date_to": d2.isoformat()}})
+    rows = iter_model_ready_rows(rev, bks)
+    return series_response(request, rows, key="rows",
+                           extra={"params": {"resort": resort, "date_from": d1.isoformat(), "date_to": d2.isoformat()}})
 
 @require_GET
 def export_year_excel(request):
@@ -464,40 +438,25 @@ def export_year_excel(request):
     resort = request.GET.get("resort")
     year = int(request.GET.get("year") or date.today().year)
 
-    d1 = date(year, 1, 1)
-    d2 = date(year, 12, 31)
-
-    rev = revenue_series(resort, d1, d2)
-    bks = bookings_series(d1, d2)
-    rows = model_ready_rows(rev, bks)
-    canc = canc_noshow_series(d1, d2, basis="all")
-    lead = leadtime_distribution(d1, d2)
-
-    sheets = {
-        "RevenueDaily": rows,
-        "Cancellations": canc,
-        "LeadTime": lead,
-    }
-    orders = {
-        "RevenueDaily": ["date","revenue","bookings","avg_rev_per_booking"],
-        "Cancellations": ["date","denominator","cancelled","no_show","cancel_rate","no_show_rate"],
-        "LeadTime": ["date","counts","share"],
-    }
-
-    path = f"/tmp/Trends_{resort or 'ALL'}_{year}.xlsx"
-    url_path = export_excel(path, sheets, orders)  
-
-    with open(url_path, "rb") as f:
-        data = f.read()
-    resp = HttpResponse(data, content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    resp["Content-Disposition"] = f'attachment; filename="{os.path.basename(url_path)}"'
-    return resp
+    # cached per (resort, year, data versions of that year); repeat downloads stream the stored file
+    path, _ = year_workbook(resort, year)
+    return FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename=f"Trends_{resort or 'ALL'}_{year}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
 
 @require_GET
+@conditional_api("ft")
 def forecast_revenue(request):
     """
-    GET /api/forecast/revenue?resort=XYZ&months=12&horizon=56
+    GET /api/forecast/revenue?resort=XYZ&months=12&horizon=56[&engine=auto|arima|holt_winters|seasonal_naive|drift][&latency_budget_ms=50]
     Clean last N months and run a simple ARIMA forecast.
+    engine / latency_budget_ms switch to the NumPy engines; auto picks the best model that fits the budget.
+    resort=A,B,C or resort=* returns {"resorts": {resort: forecast}}; the training series of every
+    resort come from one GROUP BY resort, business_date query, and engine/budget requests pick each
+    resort's engine the same way, running every NumPy model once over all resorts that chose it.
     """
     if request.GET.get("demo") == "1":
         series = _demo_revenue_series(count=120, step_days=1)
@@ -505,14 +464,172 @@ def forecast_revenue(request):
         return JsonResponse(res)
     
     resort = request.GET.get("resort")
-    months = int(request.GET.get("months") or 12)
-    horizon = int(request.GET.get("horizon") or 56)
-    days = max(28, min(370, months*30))
+    try:
+        months = int(request.GET.get("months") or 12)
+        horizon = int(request.GET.get("horizon") or 56)
+        budget = request.GET.get("latency_budget_ms")
+        budget = int(budget) if budget else None
+    except ValueError:
+        return JsonResponse({"error": "months, horizon and latency_budget_ms must be integers"}, status=400)
+    engine = (request.GET.get("engine") or "").lower()
+
+    d1, d2 = training_window(months)
+    resorts = resorts_param(request)
+    try:
+        if resorts is not None:
+            by_resort = revenue_series_by_resort(d1, d2, resorts)
+            series = {r: by_resort.get(r) or fill_missing_dates({}, d1, d2)
+                      for r in sorted(set(resorts) | set(by_resort))}
+            res = {"resorts": revenue_forecasts(series, d1, d2, horizon=horizon, engine=engine,
+                                                latency_budget_ms=budget)}
+        else:
+            res = revenue_forecast(resort, d1, d2, horizon=horizon, engine=engine, latency_budget_ms=budget)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(res)
 
-    d1, d2 = ensure_range(None, None, default_days=days)
-    res = arima_forecast_series(resort, d1, d2, horizon=horizon)
+@require_GET
+@conditional_api("ft", "booking")
+def dashboard_revenue_booking(request):
+    """
+    GET /api/dashboard/revenue_booking?resort=XYZ&date_from=&date_to=&grp=day|week|month&months=12&horizon=180[&engine=...][&latency_budget_ms=50]
+    One payload for the revenue & booking page:
+      {"revenue": <trends/revenue>, "booking_rate": <trends/booking_rate>, "forecast": <forecast/revenue>}
+    computed from shared scans instead of three requests.
+    """
+    grp = group_param(request)
+    d1, d2 = parse_dates(request)
+    resort = request.GET.get("resort")
+    try:
+        months = int(request.GET.get("months") or 12)
+        horizon = int(request.GET.get("horizon") or 180)
+        budget = request.GET.get("latency_budget_ms")
+        budget = int(budget) if budget else None
+    except ValueError:
+        return JsonResponse({"error": "months, horizon and latency_budget_ms must be integers"}, status=400)
+    engine = (request.GET.get("engine") or "").lower()
+
+    try:
+        res = revenue_booking_dashboard(resort, d1, d2, grp, months=months, horizon=horizon,
+                                        engine=engine, latency_budget_ms=budget)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
     return JsonResponse(res)
 
+@require_GET
+@conditional_api("ft")
+def forecast_backtest(request):
+    """
+    GET /api/forecast/backtest?resort=XYZ&months=12&horizon=28&folds=4&step=7&models=arima,holt_winters,...
+    Rolling-origin backtest; returns MAPE/RMSE per model (overall and per horizon step) and the best model.
+    """
+    resort = request.GET.get("resort")
+    try:
+        months = int(request.GET.get("months") or 12)
+        horizon = max(1, int(request.GET.get("horizon") or DEFAULT_HORIZON))
+        folds = max(1, min(24, int(request.GET.get("folds") or DEFAULT_FOLDS)))
+        step = max(1, int(request.GET.get("step") or DEFAULT_STEP))
+    except ValueError:
+        return JsonResponse({"error": "months, horizon, folds and step must be integers"}, status=400)
+    models = [m.strip() for m in (request.GET.get("models") or "").split(",") if m.strip()] or list(CANDIDATES)
+
+    d1, d2 = training_window(months)
+    try:
+        res = backtest(resort, d1, d2, horizon=horizon, folds=folds, step=step, models=models)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(res)
+
+@csrf_exempt
+@require_POST
+def forecast_job_submit(request):
+    """
+    POST /api/forecast/jobs  (form or query params: resort, months=12, horizon=56)
+    Queues the ARIMA fit on the job process pool and returns {"job_id", "status", "deduplicated"}.
+    An identical job still in flight is reused.
+    """
+    src = request.POST or request.GET
+    try:
+        params = {
+            "resort": src.get("resort") or None,
+            "months": int(src.get("months") or 12),
+            "horizon": int(src.get("horizon") or 56),
+        }
+    except ValueError:
+        return JsonResponse({"error": "months and horizon must be integers"}, status=400)
+
+    job, dedup = submit_job("forecast", params)
+    return JsonResponse({"job_id": job.pk, "status": job.status, "deduplicated": dedup}, status=202)
+
+@require_GET
+def forecast_job_status(request, job_id):
+    """
+    GET /api/forecast/jobs/<job_id>
+    Returns status and, once DONE, the same payload as /api/forecast/revenue.
+    """
+    job = BackgroundJob.objects.filter(pk=job_id, kind="forecast").first()
+    if job is None:
+        return JsonResponse({"error": "job not found"}, status=404)
+    return JsonResponse(job_payload(job))
+
+@csrf_exempt
+@require_POST
+def export_batch_submit(request):
+    """
+    POST /api/export/batch  (form or query params: years=2021-2025, resort=A,B (default all), format=xlsx|csv|parquet)
+    Queues a zip of the year sheets for every (resort, year) and returns {"job_id", "status", "deduplicated"}.
+    Poll /api/export/batch/<job_id> for progress, then download from /api/export/batch/<job_id>/download.
+    """
+    src = request.POST or request.GET
+    fmt = (src.get("format") or "xlsx").lower()
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+    try:
+        years = parse_years(src.get("years") or str(date.today().year))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    resorts = sorted({r.strip() for r in (src.get("resort") or "").split(",") if r.strip()})
+    params = {"resorts": resorts, "years": years, "format": fmt}
+
+    job, dedup = submit_job("batch_export", params)
+    return JsonResponse({"job_id": job.pk, "status": job.status, "deduplicated": dedup}, status=202)
+
+@require_GET
+def export_batch_status(request, job_id):
+    """
+    GET /api/export/batch/<job_id>
+    Returns status, progress {"done", "total"} while running and the zip summary once DONE.
+    """
+    job = BackgroundJob.objects.filter(pk=job_id, kind="batch_export").first()
+    if job is None:
+        return JsonResponse({"error": "job not found"}, status=404)
+    return JsonResponse(job_payload(job))
+
+@require_GET
+def export_batch_download(request, job_id):
+    """
+    GET /api/export/batch/<job_id>/download
+    Streams the finished zip.
+    """
+    job = BackgroundJob.objects.filter(pk=job_id, kind="batch_export").first()
+    if job is None:
+        return JsonResponse({"error": "job not found"}, status=404)
+    if job.status != job.DONE:
+        return JsonResponse({"error": f"job is {job.status}"}, status=409)
+    path = batch_export_path(job.result)
+    if path is None:
+        return JsonResponse({"error": "export file no longer available"}, status=410)
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=f"Trends_batch_{job.pk}.zip",
+                        content_type="application/zip")
+
+@require_GET
+def api_cache_stats(request):
+    """
+    GET /api/cache/stats
+    Hit/miss counters of the response cache (per worker process).
+    """
+    return JsonResponse(cache_stats())
+
 def ui_home(request):
     return render(request, "core/home.html")
 